@@ -1,20 +1,71 @@
 import json
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import count, islice
 from os import PathLike, path
-from typing import Dict, List
+from time import perf_counter
+from typing import Dict, Iterator, List, Tuple
 
 import httpx
 import pandas as pd
 from kami_logging import benchmark_with, logging_with
 
+from kami_pricing.api.anymarket_catalog import (
+    AnymarketCatalogError,
+    AnymarketCatalogIndex,
+    AnymarketCatalogSnapshot,
+)
+from kami_pricing.api.cache import (
+    ResponseCache,
+    get_cache_scope,
+    get_cache_tags,
+    get_resource_ids,
+)
+from kami_pricing.api.http_client import create_http_client
+from kami_pricing.api.rate_limiter import (
+    HostRateLimiters,
+    host_rate_limiters,
+)
+from kami_pricing.api.retry import RetryPolicy
 from kami_pricing.constant import ROOT_DIR
 
 anymarket_api_logger = logging.getLogger('Anymarket API')
+# shared by every instance, so lookups are reused across pricing runs
+anymarket_response_cache = ResponseCache(ttl=3600)
 test_base_url = 'https://sandbox-api.anymarket.com.br'
 base_url = 'https://api.anymarket.com.br'
 anymarket_credentials_path = path.join(
     ROOT_DIR, 'credentials/anymarket_hairpro.json'
 )
+MANUAL_PRICING_PAYLOAD = {
+    'calculatedPrice': False,
+    'definitionPriceScope': 'SKU_MARKETPLACE',
+}
+ADS_COLUMNS = [
+    'sku (*)',
+    'id',
+    'marketPlace',
+    'publicationStatus',
+    'marketplaceStatus',
+    'price',
+    'fields.title',
+]
+ADS_CATEGORICAL_COLUMNS = [
+    'marketPlace',
+    'publicationStatus',
+    'marketplaceStatus',
+]
+PRICE_UPDATE_COLUMNS = [
+    'sku (*)',
+    'ad_id',
+    'special_price',
+    'success',
+    'error',
+    'latency',
+]
 
 
 class AnymarketAPIError(Exception):
@@ -26,11 +77,76 @@ class AnymarketAPI:
         self,
         base_url: str = base_url,
         credentials_path: str = anymarket_credentials_path,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        catalog_ttl: float = 3600,
+        catalog_snapshot_path: str = None,
+        max_workers: int = 8,
+        requests_per_second: float = 5.0,
+        burst: int = 10,
+        rate_limiters: HostRateLimiters = host_rate_limiters,
+        retry_policy: RetryPolicy = None,
+        response_cache: ResponseCache = anymarket_response_cache,
+        page_size: int = 100,
+        prefetch_pages: int = 0,
+        catalog_reuse_window: float = 300,
+        max_pages: int = 1000,
     ):
         self.base_url = base_url
         self.credentials_path = credentials_path
         self.credentials = None
         self.result = None
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.client = None
+        self._client_lock = threading.Lock()
+        self.catalog_index = AnymarketCatalogIndex(
+            ttl=catalog_ttl, snapshot_path=catalog_snapshot_path
+        )
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiters.get(
+            host=httpx.URL(base_url).host,
+            requests_per_second=requests_per_second,
+            burst=burst,
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.response_cache = response_cache
+        self.page_size = page_size
+        self.prefetch_pages = prefetch_pages
+        self.max_pages = max_pages
+        self.catalog_reuse_window = catalog_reuse_window
+        self.catalog_snapshot = None
+        self._catalog_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_client(self) -> httpx.Client:
+        with self._client_lock:
+            if self.client is None:
+                self.client = create_http_client(
+                    http2=self.http2,
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                    timeout=self.timeout,
+                )
+            return self.client
+
+    def close(self):
+        with self._client_lock:
+            if self.client is not None:
+                self.client.close()
+                self.client = None
 
     def _set_credentials(self):
 
@@ -62,41 +178,83 @@ class AnymarketAPI:
         endpoint: str = '',
         payload: List = [],
         headers: Dict = {},
+        use_cache: bool = False,
+        written_ids: List = None,
     ):
         try:
+            method = method.upper()
+            use_cache = use_cache and method == 'GET'
             if not self.credentials:
                 self._set_credentials()
 
+            # shared by every client, so entries are scoped to one account
+            cache_scope = get_cache_scope(
+                self.base_url, self.credentials['token']
+            )
+            if use_cache:
+                cached = self.response_cache.get(cache_scope + endpoint)
+                if cached is not None:
+                    self.result = cached
+                    return self.result
+
+            headers = dict(headers)
             if 'Content-Type' not in headers:
                 headers['Content-Type'] = 'application/json'
             headers['gumgaToken'] = self.credentials['token']
 
-            method = method.upper()
+            client = self._get_client()
+            request = {
+                'GET': lambda: client.get(
+                    self.base_url + endpoint, headers=headers
+                ),
+                'POST': lambda: client.post(
+                    self.base_url + endpoint, json=payload, headers=headers
+                ),
+                'PUT': lambda: client.put(
+                    self.base_url + endpoint, json=payload, headers=headers
+                ),
+                'DELETE': lambda: client.delete(
+                    self.base_url + endpoint, headers=headers
+                ),
+                'PATCH': lambda: client.patch(
+                    self.base_url + endpoint, json=payload, headers=headers
+                ),
+            }.get(method)
+
+            if request is None:
+                raise ValueError(f'Unsupported HTTP method: {method}')
+
+            def send() -> httpx.Response:
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                response = request()
+                if self.rate_limiter:
+                    self.rate_limiter.observe(response.status_code)
+                return response
+
+            response = self.retry_policy.send(method, endpoint, send)
+            if method != 'GET':
+                # only the cached responses holding the written resources
+                if written_ids is None:
+                    written_ids = get_resource_ids(payload)
+                self.response_cache.invalidate_tags(
+                    get_cache_tags(endpoint, written_ids, 2, cache_scope)
+                )
 
-            with httpx.Client() as client:
-                response = {
-                    'GET': lambda: client.get(
-                        self.base_url + endpoint, headers=headers
-                    ),
-                    'POST': lambda: client.post(
-                        self.base_url + endpoint, json=payload, headers=headers
-                    ),
-                    'PUT': lambda: client.put(
-                        self.base_url + endpoint, json=payload, headers=headers
-                    ),
-                    'DELETE': lambda: client.delete(
-                        self.base_url + endpoint, headers=headers
-                    ),
-                    'PATCH': lambda: client.patch(
-                        self.base_url + endpoint, json=payload, headers=headers
+            response.raise_for_status()
+            self.result = response.json()
+            if use_cache:
+                self.response_cache.set(
+                    cache_scope + endpoint,
+                    self.result,
+                    tags=get_cache_tags(
+                        endpoint,
+                        get_resource_ids(self.result),
+                        2,
+                        cache_scope,
                     ),
-                }.get(method, lambda: None)()
-
-                if response is None:
-                    raise ValueError(f'Unsupported HTTP method: {method}')
-
-                response.raise_for_status()
-                self.result = response.json()
+                )
+            return self.result
 
         except httpx.HTTPStatusError as e:
             raise AnymarketAPIError(f'HTTP error occurred: {str(e)}')
@@ -107,6 +265,108 @@ class AnymarketAPI:
         except Exception as e:
             raise AnymarketAPIError(f'Failed to connect: {str(e)}')
 
+    def _get_page(
+        self, endpoint: str, offset: int, page_size: int
+    ) -> Tuple[List[Dict], int | None]:
+        separator = '&' if '?' in endpoint else '?'
+        result = self._connect(
+            endpoint=f'{endpoint}{separator}offset={offset}&limit={page_size}'
+        )
+        if isinstance(result, dict):
+            return (
+                result.get('content', []),
+                result.get('page', {}).get('totalElements'),
+            )
+        return result or [], None
+
+    def _fetch_pages(
+        self,
+        endpoint: str,
+        offsets: Iterator[int],
+        page_size: int,
+        prefetch: int,
+    ) -> Iterator[List[Dict]]:
+        if not prefetch:
+            for offset in offsets:
+                yield self._get_page(endpoint, offset, page_size)[0]
+            return
+
+        # keep up to `prefetch` pages in flight while the caller consumes
+        # the current one, so memory stays bounded by prefetch + 1 pages
+        with ThreadPoolExecutor(max_workers=prefetch) as executor:
+            pending = deque(
+                executor.submit(self._get_page, endpoint, offset, page_size)
+                for offset in islice(offsets, prefetch)
+            )
+            try:
+                while pending:
+                    content, _ = pending.popleft().result()
+                    yield content
+                    for offset in islice(offsets, 1):
+                        pending.append(
+                            executor.submit(
+                                self._get_page, endpoint, offset, page_size
+                            )
+                        )
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _is_repeated_page(
+        self, content: List[Dict], previous_content: List[Dict]
+    ) -> bool:
+        if not content or not previous_content:
+            return False
+        first, previous_first = content[0], previous_content[0]
+        if isinstance(first, dict) and isinstance(previous_first, dict):
+            return first.get('id', first) == previous_first.get(
+                'id', previous_first
+            )
+        return first == previous_first
+
+    def _iter_pages(
+        self, endpoint: str, page_size: int = None, prefetch: int = None
+    ) -> Iterator[Dict]:
+        page_size = page_size or self.page_size
+        if prefetch is None:
+            prefetch = self.prefetch_pages
+
+        content, total_elements = self._get_page(endpoint, 0, page_size)
+        yield from content
+        if len(content) < page_size:
+            return
+
+        offsets = (
+            count(page_size, page_size)
+            if total_elements is None
+            else iter(range(page_size, total_elements, page_size))
+        )
+        pages_read = 1
+        previous_content = content
+        with closing(
+            self._fetch_pages(endpoint, offsets, page_size, prefetch)
+        ) as pages:
+            for content in pages:
+                # endpoints that ignore offset/limit keep returning the
+                # same full page, which would never end a bare list
+                if self._is_repeated_page(content, previous_content):
+                    anymarket_api_logger.warning(
+                        f'{endpoint} returned the same page again at page {pages_read + 1}, stopping'
+                    )
+                    return
+                pages_read += 1
+                if pages_read > self.max_pages:
+                    anymarket_api_logger.error(
+                        f'{endpoint} returned more than {self.max_pages} pages'
+                    )
+                    raise AnymarketAPIError(
+                        f'Paging {endpoint} exceeded {self.max_pages} pages'
+                    )
+                yield from content
+                if len(content) < page_size:
+                    return
+                previous_content = content
+
     def get_products_quantity(self) -> int:
         try:
             self._connect(endpoint='/v2/products')
@@ -117,7 +377,9 @@ class AnymarketAPI:
 
     def get_product_by_id(self, product_id: str) -> Dict:
         try:
-            self._connect(endpoint=f'/v2/products/{product_id}')
+            self._connect(
+                endpoint=f'/v2/products/{product_id}', use_cache=True
+            )
             anymarket_api_logger.info(
                 f"Product: {self.result['id']} successfully retrieved"
             )
@@ -141,17 +403,20 @@ class AnymarketAPI:
     @logging_with(anymarket_api_logger)
     def get_ads_by_partner_id(self, partner_id: str) -> List[Dict]:
         try:
-            self._connect(
-                endpoint=f'/v2/skus/marketplaces?partnerID={partner_id}'
+            return self._connect(
+                endpoint=f'/v2/skus/marketplaces?partnerID={partner_id}',
+                use_cache=True,
             )
-            return self.result
         except Exception as e:
             raise AnymarketAPIError(f'Failed to connect: {str(e)}')
 
     def get_product_by_partner_id(self, partner_id: str) -> Dict:
         try:
-            self._connect(endpoint=f'/v2/products?partnerId={partner_id}')
-            return self.result.get('content', [])[0]
+            result = self._connect(
+                endpoint=f'/v2/products?partnerId={partner_id}',
+                use_cache=True,
+            )
+            return result.get('content', [])[0]
         except Exception as e:
             raise AnymarketAPIError(f'Failed to connect: {str(e)}')
 
@@ -176,122 +441,197 @@ class AnymarketAPI:
             (ad for ad in ads if ad['marketPlace'] == marketplace), None
         )
 
-    @benchmark_with(anymarket_api_logger)
-    @logging_with(anymarket_api_logger)
-    def get_all_products(self) -> List[Dict]:
+    def iter_products(
+        self, page_size: int = None, prefetch: int = None
+    ) -> Iterator[Dict]:
         try:
-            quantity = self.get_products_quantity()
-            self._connect(endpoint=f'/v2/products?limit={quantity}')
-            return self.result.get('content', [])
+            yield from self._iter_pages(
+                endpoint='/v2/products', page_size=page_size, prefetch=prefetch
+            )
+        except AnymarketAPIError:
+            raise
         except Exception as e:
             raise AnymarketAPIError(f'Failed to connect: {str(e)}')
 
+    @benchmark_with(anymarket_api_logger)
+    @logging_with(anymarket_api_logger)
+    def get_all_products(self) -> List[Dict]:
+        return list(self.iter_products())
+
+    @benchmark_with(anymarket_api_logger)
+    @logging_with(anymarket_api_logger)
+    def get_catalog_snapshot(
+        self, refresh: bool = False
+    ) -> AnymarketCatalogSnapshot:
+        with self._catalog_lock:
+            if (
+                refresh
+                or self.catalog_snapshot is None
+                or self.catalog_snapshot.is_expired()
+            ):
+                self.catalog_snapshot = AnymarketCatalogSnapshot(
+                    products=self.iter_products(),
+                    ttl=self.catalog_reuse_window,
+                )
+                anymarket_api_logger.info(
+                    f'Catalog snapshot fetched with {len(self.catalog_snapshot)} products'
+                )
+            return self.catalog_snapshot
+
     @benchmark_with(anymarket_api_logger)
     @logging_with(anymarket_api_logger)
     def get_all_products_ids(self) -> List[str]:
-        try:
-            products = self.get_all_products()
-            product_ids = [product['id'] for product in products]
-            return product_ids
-        except Exception as e:
-            raise AnymarketAPIError(f'Failed to connect: {str(e)}')
+        return list(self.get_catalog_snapshot().product_ids)
 
     @benchmark_with(anymarket_api_logger)
     @logging_with(anymarket_api_logger)
     def get_all_products_partner_ids(self) -> List[str]:
-        try:
-            products = self.get_all_products()
-            partner_ids = [
-                sku.get('partnerId', '')
-                for product in products
-                for sku in product.get('skus', [])
-            ]
-            return partner_ids
-        except Exception as e:
-            raise AnymarketAPIError(f'Failed to connect: {str(e)}')
+        return self.get_catalog_snapshot().partner_ids
 
     @benchmark_with(anymarket_api_logger)
     @logging_with(anymarket_api_logger)
     def get_partner_and_product_ids(self) -> (List[str], List[str]):
-        try:
-            products = self.get_all_products()
-            partner_ids = [
-                sku.get('partnerId', '')
-                for product in products
-                for sku in product.get('skus', [])
-            ]
-            product_ids = [product['id'] for product in products]
-            return partner_ids, product_ids
-        except Exception as e:
-            raise AnymarketAPIError(f'Failed to connect: {str(e)}')
+        snapshot = self.get_catalog_snapshot()
+        return snapshot.partner_ids, list(snapshot.product_ids)
+
+    def _switch_to_manual_pricing(self, product_id: str):
+        headers = {'Content-Type': 'application/merge-patch+json'}
+        self._connect(
+            method='PATCH',
+            endpoint=f'/v2/products/{product_id}',
+            headers=headers,
+            payload=MANUAL_PRICING_PAYLOAD,
+            written_ids=[product_id],
+        )
+        anymarket_api_logger.info(
+            f'Set product: {product_id} for manual pricing'
+        )
 
     def set_product_for_manual_pricing(self, product_id: str):
         try:
-            payload = {
-                'calculatedPrice': False,
-                'definitionPriceScope': 'SKU_MARKETPLACE',
-            }
-            headers = {'Content-Type': 'application/merge-patch+json'}
-            self._connect(
-                method='PATCH',
-                endpoint=f'/v2/products/{product_id}',
-                headers=headers,
-                payload=payload,
-            )
-            anymarket_api_logger.info(
-                f'Set product: {product_id} for manual pricing'
-            )
+            self._switch_to_manual_pricing(product_id)
         except Exception as e:
             anymarket_api_logger.exception(str(e))
 
+    def _try_switch_to_manual_pricing(self, product_id: str) -> str | None:
+        try:
+            self._switch_to_manual_pricing(product_id)
+            return None
+        except Exception as e:
+            return str(e)
+
     @benchmark_with(anymarket_api_logger)
     @logging_with(anymarket_api_logger)
-    def set_products_for_manual_pricing(self, product_ids: list):
+    def set_products_for_manual_pricing(
+        self, product_ids: list, use_catalog: bool = True
+    ) -> Dict[str, List]:
+        result = {'switched': [], 'skipped': [], 'failed': []}
+        pending = list(dict.fromkeys(product_ids))
+        if not pending:
+            return result
+
+        manual_product_ids = set()
+        if use_catalog:
+            try:
+                # a fresh index, even one loaded from disk, avoids listing
+                # the whole catalog again
+                manual_product_ids = (
+                    self.build_catalog_index().manual_pricing_product_ids
+                )
+            except Exception as e:
+                anymarket_api_logger.warning(
+                    f'Switching all products, catalog is unavailable: {str(e)}'
+                )
+        result['skipped'] = [
+            product_id
+            for product_id in pending
+            if product_id in manual_product_ids
+        ]
+        pending = [
+            product_id
+            for product_id in pending
+            if product_id not in manual_product_ids
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            errors = list(
+                executor.map(self._try_switch_to_manual_pricing, pending)
+            )
+        for product_id, error in zip(pending, errors):
+            if error is None:
+                result['switched'].append(product_id)
+                self.catalog_index.add_manual_pricing_product(product_id)
+            else:
+                result['failed'].append(product_id)
+                anymarket_api_logger.error(
+                    f'Failed to set product: {product_id} for manual pricing: {error}'
+                )
+
+        if result['switched'] and not self.catalog_index.is_expired():
+            try:
+                self.catalog_index.save()
+            except AnymarketCatalogError as e:
+                anymarket_api_logger.warning(str(e))
+
+        anymarket_api_logger.info(
+            f"{len(result['switched'])} products switched to manual pricing, {len(result['skipped'])} already manual and {len(result['failed'])} failed"
+        )
+        return result
+
+    def _normalize_ads(self, ads: List[Dict]) -> pd.DataFrame:
+        ads_df = pd.json_normalize(ads)
+        ads_df.rename(columns={'skuInMarketplace': 'sku (*)'}, inplace=True)
+        ads_df = ads_df.reindex(columns=ADS_COLUMNS)
+        ads_df['price'] = pd.to_numeric(ads_df['price'], errors='coerce')
+        return ads_df
+
+    def _fetch_partner_ads(self, partner_id: str) -> pd.DataFrame | None:
         try:
-            for product_id in product_ids:
-                self.set_product_for_manual_pricing(product_id)
+            return self._normalize_ads(
+                self.get_ads_by_partner_id(partner_id=partner_id)
+            )
         except Exception as e:
-            anymarket_api_logger.exception(str(e))
+            anymarket_api_logger.error(
+                f'Failed to get advertisements of sku {partner_id}: {str(e)}'
+            )
+            return None
 
     @benchmark_with(anymarket_api_logger)
     @logging_with(anymarket_api_logger)
     def get_products_ads(self, partner_ids: list):
         try:
-            advertisements = []
-            for partner_id in partner_ids:
-                advertisements.extend(
-                    self.get_ads_by_partner_id(partner_id=partner_id)
-                )
-            ads_df = pd.json_normalize(advertisements)
-            ads_df.rename(
-                columns={'skuInMarketplace': 'sku (*)'}, inplace=True
-            )
-            ads_df = ads_df[
-                [
-                    'sku (*)',
-                    'id',
-                    'marketPlace',
-                    'publicationStatus',
-                    'marketplaceStatus',
-                    'price',
-                    'fields.title',
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                ads_dfs = [
+                    ads_df
+                    for ads_df in executor.map(
+                        self._fetch_partner_ads, partner_ids
+                    )
+                    if ads_df is not None and not ads_df.empty
                 ]
-            ]
-            ads_df.dropna(subset=['fields.title'], inplace=True)
+            if ads_dfs:
+                ads_df = pd.concat(ads_dfs, ignore_index=True)
+            else:
+                ads_df = pd.DataFrame(columns=ADS_COLUMNS)
+            ads_df = ads_df.dropna(subset=['fields.title']).astype(
+                {column: 'category' for column in ADS_CATEGORICAL_COLUMNS}
+            )
             return ads_df
         except Exception as e:
             anymarket_api_logger.exception(str(e))
 
-    def update_price(self, ad_id: str, new_price: float):
+    def _get_price_payload(self, ad_id: str, new_price: float) -> Dict:
         if round(new_price, 2) != new_price:
             raise AnymarketAPIError(
                 f'New Price: {new_price} must have at most 2 decimal places'
             )
-        payload = {
+        return {
             'id': ad_id,
             'price': new_price,
             'discountPrice': new_price,
         }
+
+    def update_price(self, ad_id: str, new_price: float):
+        payload = self._get_price_payload(ad_id=ad_id, new_price=new_price)
         self._connect(
             method='PUT',
             endpoint='/v2/skus/marketplaces/prices',
@@ -301,6 +641,98 @@ class AnymarketAPI:
             f'Advertisement: {ad_id} updated price to {new_price}'
         )
 
+    def _get_failed_prices(self, result) -> Dict:
+        failed_prices = {}
+        if isinstance(result, list):
+            for item in result:
+                if isinstance(item, dict) and item.get('errorMessage'):
+                    failed_prices[item.get('id')] = item['errorMessage']
+        return failed_prices
+
+    def _send_price_batch(self, batch: List[Dict]) -> List[Dict]:
+        start = perf_counter()
+        payload = []
+        errors = {}
+        for row in batch:
+            try:
+                payload.append(
+                    self._get_price_payload(
+                        ad_id=row['ad_id'], new_price=row['special_price']
+                    )
+                )
+            except AnymarketAPIError as e:
+                errors[row['ad_id']] = str(e)
+
+        if payload:
+            try:
+                result = self._connect(
+                    method='PUT',
+                    endpoint='/v2/skus/marketplaces/prices',
+                    payload=payload,
+                )
+                errors.update(self._get_failed_prices(result))
+            except AnymarketAPIError as e:
+                errors.update({item['id']: str(e) for item in payload})
+
+        latency = perf_counter() - start
+        return [
+            {
+                **row,
+                'success': row['ad_id'] not in errors,
+                'error': errors.get(row['ad_id']),
+                'latency': (row.get('latency') or 0) + latency,
+            }
+            for row in batch
+        ]
+
+    def _send_price_batches(
+        self, rows: List[Dict], batch_size: int = 100
+    ) -> List[Dict]:
+        batches = [
+            rows[start : start + batch_size]
+            for start in range(0, len(rows), batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return [
+                row
+                for batch_results in executor.map(
+                    self._send_price_batch, batches
+                )
+                for row in batch_results
+            ]
+
+    def _summarize_price_updates(self, results: List[Dict]) -> pd.DataFrame:
+        results_df = pd.DataFrame(results, columns=PRICE_UPDATE_COLUMNS)
+        failed_df = results_df[~results_df['success'].astype(bool)]
+        for row in failed_df.to_dict('records'):
+            anymarket_api_logger.error(
+                f"Failed to update price of sku {row['sku (*)']}: {row['error']}"
+            )
+        anymarket_api_logger.info(
+            f'{len(results_df) - len(failed_df)} prices updated and {len(failed_df)} failed'
+        )
+        return results_df
+
+    @benchmark_with(anymarket_api_logger)
+    @logging_with(anymarket_api_logger)
+    def update_prices_in_batches(
+        self, ads_df: pd.DataFrame, batch_size: int = 100
+    ) -> pd.DataFrame:
+        rows = [
+            {
+                'sku (*)': row['sku (*)'],
+                'ad_id': row['id'],
+                'special_price': row['special_price'],
+                'success': False,
+                'error': None,
+                'latency': 0.0,
+            }
+            for row in ads_df.to_dict('records')
+        ]
+        return self._summarize_price_updates(
+            self._send_price_batches(rows=rows, batch_size=batch_size)
+        )
+
     def change_price(self, marketplace: str, ads_df: pd.DataFrame):
         try:
             for index, row in ads_df[
@@ -336,23 +768,144 @@ class AnymarketAPI:
             anymarket_api_logger.exception(str(e))
             raise
 
+    @benchmark_with(anymarket_api_logger)
+    @logging_with(anymarket_api_logger)
+    def build_catalog_index(
+        self, marketplace: str = None, page_size: int = None
+    ) -> AnymarketCatalogIndex:
+        if not self.catalog_index.is_expired():
+            return self.catalog_index
+        if self.catalog_index.load():
+            anymarket_api_logger.info(
+                f'Catalog index loaded from {self.catalog_index.snapshot_path}'
+            )
+            return self.catalog_index
+
+        snapshot = self.get_catalog_snapshot()
+        ads_endpoint = '/v2/skus/marketplaces'
+        if marketplace:
+            ads_endpoint += f'?marketplace={marketplace}'
+        try:
+            ads = list(
+                self._iter_pages(endpoint=ads_endpoint, page_size=page_size)
+            )
+        except AnymarketAPIError as e:
+            anymarket_api_logger.warning(
+                f'Indexing products only, advertisements listing failed: {str(e)}'
+            )
+            ads = []
+
+        self.catalog_index.build_from_snapshot(snapshot=snapshot, ads=ads)
+        self.catalog_index.save()
+        return self.catalog_index
+
+    def _get_marketplace_ad(self, partner_id: str, marketplace: str) -> Dict:
+        product_id = self.catalog_index.get_product_id(partner_id)
+        if product_id is None:
+            product_id = self.get_product_by_partner_id(partner_id=partner_id)[
+                'id'
+            ]
+            self.catalog_index.add_product(partner_id, product_id)
+
+        ad_id = self.catalog_index.get_ad_id(partner_id, marketplace)
+        if ad_id is None:
+            # served by response_cache when the ads were just harvested
+            ads = self.get_ads_by_partner_id(partner_id=partner_id)
+            marketplace_ad = self.get_first_ad_of_marketplace(
+                ads=ads, marketplace=marketplace
+            )
+            if marketplace_ad is None:
+                raise AnymarketAPIError(
+                    f'Sku {partner_id} has no advertisement on {marketplace}'
+                )
+            ad_id = marketplace_ad['id']
+            self.catalog_index.add_ad(partner_id, marketplace, ad_id)
+        return {
+            'id': ad_id,
+            'marketPlace': marketplace,
+            'product_id': product_id,
+        }
+
+    def _resolve_sku_ad(self, row: Dict, marketplace: str) -> Dict:
+        start = perf_counter()
+        result = {
+            'sku (*)': row['sku (*)'],
+            'product_id': None,
+            'ad_id': None,
+            'special_price': round(float(row['special_price']), 2),
+            'success': False,
+            'error': None,
+        }
+        try:
+            marketplace_ad = self._get_marketplace_ad(
+                partner_id=row['sku (*)'], marketplace=marketplace
+            )
+            result['product_id'] = marketplace_ad.get('product_id')
+            result['ad_id'] = marketplace_ad['id']
+        except Exception as e:
+            result['error'] = str(e)
+        result['latency'] = perf_counter() - start
+        return result
+
+    def _send_sku_price(self, result: Dict) -> Dict:
+        start = perf_counter()
+        try:
+            self.update_price(
+                ad_id=result['ad_id'], new_price=result['special_price']
+            )
+            result['success'] = True
+        except Exception as e:
+            result['error'] = str(e)
+        result['latency'] += perf_counter() - start
+        return result
+
+    @benchmark_with(anymarket_api_logger)
+    @logging_with(anymarket_api_logger)
     def update_prices_on_marketplace(
-        self, pricing_df: pd.DataFrame, marketplace: str = 'BELEZA_NA_WEB'
-    ):
-        for index, row in pricing_df.iterrows():
+        self,
+        pricing_df: pd.DataFrame,
+        marketplace: str = 'BELEZA_NA_WEB',
+        batch_size: int = 100,
+        use_catalog_index: bool = True,
+    ) -> pd.DataFrame:
+        if use_catalog_index:
             try:
-                product = self.get_product_by_partner_id(
-                    partner_id=row['sku (*)']
+                self.build_catalog_index(marketplace=marketplace)
+            except Exception as e:
+                anymarket_api_logger.exception(
+                    f'Falling back to per sku lookups: {str(e)}'
                 )
-                self.set_product_for_manual_pricing(product_id=product['id'])
-                ads = self.get_ads_by_partner_id(partner_id=row['sku (*)'])
-                marketplace_ad = self.get_first_ad_of_marketplace(
-                    ads=ads, marketplace=marketplace
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(
+                executor.map(
+                    lambda row: self._resolve_sku_ad(
+                        row=row, marketplace=marketplace
+                    ),
+                    pricing_df.to_dict('records'),
                 )
-                formatted_price = f"{row['special_price']:.2f}"
-                self.update_price(
-                    ad_id=marketplace_ad['id'], new_price=formatted_price
+            )
+            resolved = [
+                result for result in results if result['ad_id'] is not None
+            ]
+            self.set_products_for_manual_pricing(
+                product_ids=[
+                    result['product_id']
+                    for result in resolved
+                    if result['product_id'] is not None
+                ],
+                use_catalog=use_catalog_index,
+            )
+            if batch_size:
+                sent = self._send_price_batches(
+                    rows=resolved, batch_size=batch_size
                 )
-            except Exception as e:
-                anymarket_api_logger.exception(str(e))
-                continue
+            else:
+                sent = list(executor.map(self._send_sku_price, resolved))
+
+        sent = iter(sent)
+        results = [
+            next(sent) if result['ad_id'] is not None else result
+            for result in results
+        ]
+        return self._summarize_price_updates(results)
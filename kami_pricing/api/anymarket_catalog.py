@@ -0,0 +1,202 @@
+import json
+import logging
+import time
+from functools import cached_property
+from os import makedirs, path
+from typing import Dict, Iterable, List, Set
+
+import pandas as pd
+
+anymarket_catalog_logger = logging.getLogger('Anymarket Catalog')
+
+
+class AnymarketCatalogError(Exception):
+    pass
+
+
+class AnymarketCatalogIndex:
+    def __init__(self, ttl: float = 3600, snapshot_path: str = None):
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.product_ids: Dict[str, str] = {}
+        self.ad_ids: Dict[str, Dict[str, str]] = {}
+        self.manual_pricing_product_ids: Set[str] = set()
+        self.built_at = None
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    def is_expired(self) -> bool:
+        if self.built_at is None:
+            return True
+        return time.time() - self.built_at > self.ttl
+
+    def add_product(self, partner_id: str, product_id: str):
+        self.product_ids[str(partner_id)] = product_id
+
+    def add_ad(self, partner_id: str, marketplace: str, ad_id: str):
+        # keep the first ad of each marketplace, like
+        # AnymarketAPI.get_first_ad_of_marketplace
+        self.ad_ids.setdefault(str(partner_id), {}).setdefault(
+            marketplace, ad_id
+        )
+
+    def add_manual_pricing_product(self, product_id: str):
+        self.manual_pricing_product_ids.add(product_id)
+
+    def get_product_id(self, partner_id: str) -> str | None:
+        return self.product_ids.get(str(partner_id))
+
+    def get_ad_id(self, partner_id: str, marketplace: str) -> str | None:
+        return self.ad_ids.get(str(partner_id), {}).get(marketplace)
+
+    def build(self, products: Iterable[Dict], ads: Iterable[Dict] = ()):
+        self.build_from_snapshot(
+            AnymarketCatalogSnapshot(products=products), ads=ads
+        )
+
+    def build_from_snapshot(
+        self, snapshot: 'AnymarketCatalogSnapshot', ads: Iterable[Dict] = ()
+    ):
+        self.product_ids = {}
+        self.ad_ids = {}
+        self.manual_pricing_product_ids = set(
+            snapshot.manual_pricing_product_ids
+        )
+        for partner_id, product_id in snapshot.partner_product_ids.items():
+            self.add_product(partner_id, product_id)
+
+        for ad in ads:
+            partner_id = (
+                ad.get('partnerId')
+                or snapshot.sku_partner_ids.get(ad.get('idSku'))
+                or ad.get('skuInMarketplace')
+            )
+            if partner_id and ad.get('marketPlace'):
+                self.add_ad(partner_id, ad['marketPlace'], ad['id'])
+
+        self.built_at = time.time()
+        anymarket_catalog_logger.info(
+            f'Catalog index built with {len(self.product_ids)} skus and {sum(len(ads) for ads in self.ad_ids.values())} advertisements'
+        )
+
+    def save(self):
+        if not self.snapshot_path:
+            return
+        try:
+            snapshot_dir = path.dirname(self.snapshot_path)
+            if snapshot_dir:
+                makedirs(snapshot_dir, exist_ok=True)
+            with open(self.snapshot_path, 'w') as f:
+                json.dump(
+                    {
+                        'built_at': self.built_at,
+                        'product_ids': self.product_ids,
+                        'ad_ids': self.ad_ids,
+                        'manual_pricing_product_ids': sorted(
+                            self.manual_pricing_product_ids, key=str
+                        ),
+                    },
+                    f,
+                )
+        except (OSError, TypeError) as e:
+            raise AnymarketCatalogError(
+                f'Failed to save catalog snapshot at {self.snapshot_path}: {str(e)}'
+            )
+
+    def load(self) -> bool:
+        if not self.snapshot_path or not path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            anymarket_catalog_logger.warning(
+                f'Ignoring unreadable catalog snapshot at {self.snapshot_path}: {str(e)}'
+            )
+            return False
+
+        built_at = snapshot.get('built_at')
+        if built_at is None or time.time() - built_at > self.ttl:
+            return False
+        self.product_ids = snapshot.get('product_ids', {})
+        self.ad_ids = snapshot.get('ad_ids', {})
+        self.manual_pricing_product_ids = set(
+            snapshot.get('manual_pricing_product_ids', [])
+        )
+        self.built_at = built_at
+        return True
+
+
+class AnymarketCatalogSnapshot:
+    def __init__(self, products: Iterable[Dict], ttl: float = 300):
+        self.ttl = ttl
+        self.product_ids: List[str] = []
+        self.skus: List[Dict] = []
+        # keep only the fields the pricing flow needs, so the snapshot
+        # stays small while products are streamed page by page
+        for product in products:
+            self.product_ids.append(product['id'])
+            for sku in product.get('skus', []):
+                self.skus.append(
+                    {
+                        'product_id': product['id'],
+                        'sku_id': sku.get('id'),
+                        'partner_id': sku.get('partnerId', ''),
+                        'title': product.get('title'),
+                        'calculated_price': product.get('calculatedPrice'),
+                        'definition_price_scope': product.get(
+                            'definitionPriceScope'
+                        ),
+                    }
+                )
+        self.fetched_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    def is_expired(self) -> bool:
+        return time.time() - self.fetched_at > self.ttl
+
+    @property
+    def partner_ids(self) -> List[str]:
+        return [sku['partner_id'] for sku in self.skus]
+
+    @cached_property
+    def partner_product_ids(self) -> Dict[str, str]:
+        partner_product_ids = {}
+        for sku in self.skus:
+            if sku['partner_id']:
+                partner_product_ids[str(sku['partner_id'])] = sku['product_id']
+        return partner_product_ids
+
+    @cached_property
+    def sku_partner_ids(self) -> Dict[str, str]:
+        return {
+            sku['sku_id']: sku['partner_id']
+            for sku in self.skus
+            if sku['partner_id']
+        }
+
+    @cached_property
+    def manual_pricing_product_ids(self) -> Set[str]:
+        return {
+            sku['product_id']
+            for sku in self.skus
+            if sku['calculated_price'] is False
+            and sku['definition_price_scope'] == 'SKU_MARKETPLACE'
+        }
+
+    @cached_property
+    def dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            self.skus,
+            columns=[
+                'product_id',
+                'sku_id',
+                'partner_id',
+                'title',
+                'calculated_price',
+                'definition_price_scope',
+            ],
+        )
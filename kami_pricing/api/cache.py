@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from os import listdir, makedirs, path, remove
+from typing import Any, Callable, Dict, Iterable, List
+
+response_cache_logger = logging.getLogger('Response Cache')
+
+
+def get_resource_prefix(endpoint: str, depth: int = 1) -> str:
+    # '/v2/skus/marketplaces/prices' with depth 2 -> '/v2/skus'
+    segments = endpoint.split('?')[0].split('/')
+    return '/'.join(segments[: depth + 1])
+
+
+def get_resource_ids(result: Any) -> List[str]:
+    # a single resource, a page ({'content': [...]}) or a list of them
+    if isinstance(result, dict):
+        items = result.get('content')
+        if not isinstance(items, list):
+            items = [result]
+    elif isinstance(result, list):
+        items = result
+    else:
+        return []
+    return [
+        str(item['id'])
+        for item in items
+        if isinstance(item, dict) and item.get('id') is not None
+    ]
+
+
+def get_cache_scope(base_url: str, credential: str) -> str:
+    # the credential is hashed, so tokens never end up in cache files
+    digest = hashlib.sha256(str(credential).encode()).hexdigest()[:16]
+    return f'{base_url}|{digest}|'
+
+
+def get_cache_tags(
+    endpoint: str, resource_ids: Iterable = (), depth: int = 1, scope: str = ''
+) -> List[str]:
+    # '/v2/products/10' with ids [10] -> ['/v2/products/10', '/v2/products:10']
+    resource = get_resource_prefix(endpoint, depth)
+    return [scope + endpoint.split('?')[0]] + [
+        f'{scope}{resource}:{resource_id}' for resource_id in resource_ids
+    ]
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 600,
+        cache_dir: str = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.entries: OrderedDict[str, tuple] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _get_file_path(self, key: str) -> str:
+        file_name = hashlib.sha256(key.encode()).hexdigest()
+        return path.join(self.cache_dir, f'{file_name}.json')
+
+    def _read_file(self, key: str) -> tuple | None:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._get_file_path(key), 'r') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            response_cache_logger.warning(
+                f'Ignoring unreadable cache entry for {key}: {str(e)}'
+            )
+            return None
+        if entry.get('key') != key:
+            return None
+        return (
+            entry['expires_at'],
+            entry['value'],
+            frozenset(entry.get('tags', [])),
+        )
+
+    def _write_file(
+        self, key: str, expires_at: float, value: Any, tags: frozenset
+    ):
+        if not self.cache_dir:
+            return
+        try:
+            makedirs(self.cache_dir, exist_ok=True)
+            with open(self._get_file_path(key), 'w') as f:
+                json.dump(
+                    {
+                        'key': key,
+                        'expires_at': expires_at,
+                        'value': value,
+                        'tags': sorted(tags),
+                    },
+                    f,
+                )
+        except (OSError, TypeError) as e:
+            response_cache_logger.warning(
+                f'Failed to write cache entry for {key}: {str(e)}'
+            )
+
+    def _remove_file(self, key: str):
+        if not self.cache_dir:
+            return
+        try:
+            remove(self._get_file_path(key))
+        except OSError:
+            pass
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self._read_file(key)
+            if entry is None or entry[0] <= time.time():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self._evict()
+            self.hits += 1
+            return entry[1]
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def set(
+        self, key: str, value: Any, ttl: float = None, tags: Iterable[str] = ()
+    ):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        tags = frozenset(tags)
+        with self._lock:
+            self.entries[key] = (expires_at, value, tags)
+            self.entries.move_to_end(key)
+            self._evict()
+            self._write_file(key, expires_at, value, tags)
+
+    def _invalidate_where(
+        self, matches: Callable[[str, frozenset], bool], description: str
+    ):
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self.entries.items()
+                if matches(key, entry[2])
+            ]
+            for key in keys:
+                del self.entries[key]
+                self._remove_file(key)
+            if self.cache_dir and path.isdir(self.cache_dir):
+                # entries only on disk were not loaded in this process yet
+                for file_name in listdir(self.cache_dir):
+                    file_path = path.join(self.cache_dir, file_name)
+                    try:
+                        with open(file_path, 'r') as f:
+                            entry = json.load(f)
+                        key = entry.get('key', '')
+                        if matches(key, frozenset(entry.get('tags', []))):
+                            remove(file_path)
+                            keys.append(key)
+                    except (OSError, json.JSONDecodeError):
+                        continue
+        if keys:
+            response_cache_logger.info(
+                f'Invalidated {len(keys)} cached responses for {description}'
+            )
+
+    def invalidate(self, prefix: str = ''):
+        self._invalidate_where(
+            lambda key, tags: key.startswith(prefix), prefix or '/'
+        )
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        tags = frozenset(tags)
+        if tags:
+            self._invalidate_where(
+                lambda key, entry_tags: bool(entry_tags & tags),
+                ', '.join(sorted(tags)),
+            )
+
+    def get_metrics(self) -> Dict[str, float]:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'size': len(self.entries),
+            }
@@ -0,0 +1,23 @@
+from importlib.util import find_spec
+
+import httpx
+
+HTTP2_AVAILABLE = find_spec('h2') is not None
+
+
+def create_http_client(
+    http2: bool = True,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 30.0,
+    timeout: float = 30.0,
+) -> httpx.Client:
+    return httpx.Client(
+        http2=http2 and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(timeout),
+    )
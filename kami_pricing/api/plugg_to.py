@@ -1,12 +1,22 @@
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from os import path
-from typing import Dict, List
+from time import perf_counter
+from typing import Dict, List, Tuple
 
 import httpx
 import pandas as pd
 from kami_logging import benchmark_with, logging_with
 
+from kami_pricing.api.http_client import create_http_client
+from kami_pricing.api.rate_limiter import (
+    HostRateLimiters,
+    host_rate_limiters,
+)
+from kami_pricing.api.retry import RetryPolicy
+from kami_pricing.api.token_cache import TokenCache
 from kami_pricing.constant import ROOT_DIR
 
 plugg_to_api_logger = logging.getLogger('PluggTo API')
@@ -14,10 +24,28 @@ base_url: str = 'https://api.plugg.to'
 plugg_to_credentials_path: str = path.join(
     ROOT_DIR, 'credentials/plugg_to_hairpro.json'
 )
+plugg_to_token_cache = TokenCache()
+default_token_expires_in: float = 3600
+PRICE_UPDATE_COLUMNS = [
+    'sku (*)',
+    'special_price',
+    'success',
+    'error',
+    'attempts',
+    'latency',
+]
 
 
 class PluggToAPIError(Exception):
-    pass
+    def __init__(
+        self,
+        message: str = '',
+        status_code: int = None,
+        network_error: bool = False,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.network_error = network_error
 
 
 class PluggToAPI:
@@ -25,12 +53,64 @@ class PluggToAPI:
         self,
         base_url: str = base_url,
         credentials_path: str = plugg_to_credentials_path,
+        token_cache: TokenCache = plugg_to_token_cache,
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        max_workers: int = 8,
+        requests_per_second: float = 5.0,
+        burst: int = 10,
+        rate_limiters: HostRateLimiters = host_rate_limiters,
+        retry_policy: RetryPolicy = None,
+        max_retries: int = 1,
     ):
         self.base_url = base_url
         self.credentials_path = credentials_path
         self.credentials = None
         self.access_token = None
+        self.token_cache = token_cache
         self.result = None
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.client = None
+        self._client_lock = threading.Lock()
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiters.get(
+            host=httpx.URL(base_url).host,
+            requests_per_second=requests_per_second,
+            burst=burst,
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.max_retries = max_retries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_client(self) -> httpx.Client:
+        with self._client_lock:
+            if self.client is None:
+                self.client = create_http_client(
+                    http2=self.http2,
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry,
+                    timeout=self.timeout,
+                )
+            return self.client
+
+    def close(self):
+        with self._client_lock:
+            if self.client is not None:
+                self.client.close()
+                self.client = None
 
     @benchmark_with(plugg_to_api_logger)
     @logging_with(plugg_to_api_logger)
@@ -55,33 +135,105 @@ class PluggToAPI:
 
     @benchmark_with(plugg_to_api_logger)
     @logging_with(plugg_to_api_logger)
-    def _set_access_token(self):
+    def _request_access_token(self) -> Tuple[str, float]:
+        headers = {
+            'accept': 'application/json',
+            'Content-Type': 'application/x-www-form-urlencoded',
+        }
+        payload = {
+            'client_id': self.credentials['client_id'],
+            'client_secret': self.credentials['client_secret'],
+            'username': self.credentials['username'],
+            'password': self.credentials['password'],
+            'grant_type': 'password',
+        }
+        response = self.retry_policy.send(
+            'POST',
+            '/oauth/token',
+            lambda: self._get_client().post(
+                f'{self.base_url}/oauth/token',
+                data=payload,
+                headers=headers,
+            ),
+        )
+        response.raise_for_status()
+        token = response.json()
+        return token['access_token'], float(
+            token.get('expires_in', default_token_expires_in)
+        )
+
+    def _get_token_cache_key(self) -> str:
+        return f"{self.base_url}|{self.credentials['client_id']}|{self.credentials['username']}"
+
+    def _set_access_token(self) -> str:
         try:
             if not self.credentials:
                 self._set_credentials()
 
-            headers = {
-                'accept': 'application/json',
-                'Content-Type': 'application/x-www-form-urlencoded',
-            }
-            payload = {
-                'client_id': self.credentials['client_id'],
-                'client_secret': self.credentials['client_secret'],
-                'username': self.credentials['username'],
-                'password': self.credentials['password'],
-                'grant_type': 'password',
-            }
-            with httpx.Client() as client:
-                response = client.post(
-                    f'{self.base_url}/oauth/token',
-                    data=payload,
-                    headers=headers,
-                )
-                response.raise_for_status()
-                self.access_token = response.json()['access_token']
+            self.access_token = self.token_cache.get(
+                self._get_token_cache_key(), self._request_access_token
+            )
+            return self.access_token
         except Exception as e:
             raise Exception(f'Failed to set access token: {str(e)}')
 
+    def _invalidate_access_token(self, rejected_token: str):
+        self.token_cache.invalidate(
+            self._get_token_cache_key(), if_token=rejected_token
+        )
+
+    def _send(
+        self,
+        method: str = 'GET',
+        endpoint: str = '',
+        payload: List = [],
+        headers: Dict = {},
+        access_token: str = None,
+    ) -> httpx.Response:
+        # the token is kept local: threads share this instance
+        access_token = access_token or self._set_access_token()
+        headers = dict(headers)
+        if 'Content-Type' not in headers:
+            headers['Content-Type'] = 'application/json'
+        if 'accept' not in headers:
+            headers['accept'] = 'application/json'
+        if 'Authorization' not in headers:
+            headers['Authorization'] = f'Bearer {access_token}'
+
+        method = method.upper()
+
+        client = self._get_client()
+        request = {
+            'GET': lambda: client.get(
+                self.base_url + endpoint, headers=headers
+            ),
+            'POST': lambda: client.post(
+                self.base_url + endpoint, json=payload, headers=headers
+            ),
+            'PUT': lambda: client.put(
+                self.base_url + endpoint, content=payload, headers=headers
+            ),
+            'DELETE': lambda: client.delete(
+                self.base_url + endpoint, headers=headers
+            ),
+            'PATCH': lambda: client.patch(
+                self.base_url + endpoint, json=payload, headers=headers
+            ),
+        }.get(method)
+
+        if request is None:
+            raise ValueError(f'Unsupported HTTP method: {method}')
+
+        def send() -> httpx.Response:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            response = request()
+            if self.rate_limiter:
+                self.rate_limiter.observe(response.status_code)
+            return response
+
+        return self.retry_policy.send(method, endpoint, send)
+
     def _connect(
         self,
         method: str = 'GET',
@@ -90,46 +242,30 @@ class PluggToAPI:
         headers: Dict = {},
     ):
         try:
-            if not self.access_token:
-                self._set_access_token()
-            if 'Content-Type' not in headers:
-                headers['Content-Type'] = 'application/json'
-            if 'accept' not in headers:
-                headers['accept'] = 'application/json'
-            if 'Authorization' not in headers:
-                headers['Authorization'] = f'Bearer {self.access_token}'
-
-            method = method.upper()
-
-            with httpx.Client() as client:
-                response = {
-                    'GET': lambda: client.get(
-                        self.base_url + endpoint, headers=headers
-                    ),
-                    'POST': lambda: client.post(
-                        self.base_url + endpoint, json=payload, headers=headers
-                    ),
-                    'PUT': lambda: client.put(
-                        self.base_url + endpoint, data=payload, headers=headers
-                    ),
-                    'DELETE': lambda: client.delete(
-                        self.base_url + endpoint, headers=headers
-                    ),
-                    'PATCH': lambda: client.patch(
-                        self.base_url + endpoint, json=payload, headers=headers
-                    ),
-                }.get(method, lambda: None)()
-
-                if response is None:
-                    raise ValueError(f'Unsupported HTTP method: {method}')
-
-                response.raise_for_status()
-                self.result = response.json()
+            access_token = self._set_access_token()
+            response = self._send(
+                method, endpoint, payload, headers, access_token
+            )
+            if response.status_code == 401:
+                plugg_to_api_logger.warning(
+                    'Access token rejected, requesting a new one'
+                )
+                self._invalidate_access_token(access_token)
+                response = self._send(method, endpoint, payload, headers)
+
+            response.raise_for_status()
+            self.result = response.json()
+            return self.result
 
         except httpx.HTTPStatusError as e:
-            raise PluggToAPIError(f'HTTP error occurred: {str(e)}')
+            raise PluggToAPIError(
+                f'HTTP error occurred: {str(e)}',
+                status_code=e.response.status_code,
+            )
         except httpx.RequestError as e:
-            raise PluggToAPIError(f'Failed to connect: {str(e)}')
+            raise PluggToAPIError(
+                f'Failed to connect: {str(e)}', network_error=True
+            )
         except ValueError as e:
             raise PluggToAPIError(str(e))
         except Exception as e:
@@ -150,14 +286,91 @@ class PluggToAPI:
                 f'Product: {sku} updated price to {new_price}'
             )
         except PluggToAPIError as e:
-            raise PluggToAPIError(f'Failed to update price: {str(e)}')
+            raise PluggToAPIError(
+                f'Failed to update price: {str(e)}',
+                status_code=e.status_code,
+                network_error=e.network_error,
+            )
 
-    def update_prices(self, pricing_df: pd.DataFrame):
+    def _update_sku_price(self, row: Dict) -> Dict:
+        start = perf_counter()
         try:
-            for index, row in pricing_df.iterrows():
-                self.update_price(
-                    sku=str(row['sku (*)']), new_price=row['special_price']
-                )
+            self.update_price(
+                sku=row['sku (*)'], new_price=row['special_price']
+            )
+            row['success'] = True
+            row['error'] = None
+            row['retryable'] = False
+        except PluggToAPIError as e:
+            row['success'] = False
+            row['error'] = str(e)
+            row['retryable'] = self._is_retryable_failure(e)
         except Exception as e:
-            PluggToAPIError(e)
-            raise
+            row['success'] = False
+            row['error'] = str(e)
+            row['retryable'] = False
+        row['attempts'] += 1
+        row['latency'] += perf_counter() - start
+        return row
+
+    def _is_retryable_failure(self, error: PluggToAPIError) -> bool:
+        # only transient failures are worth sending again. They reach this
+        # point once the retry policy ran out of attempts, so they are sent
+        # after the rest of the batch, when the host had time to recover
+        return (
+            error.network_error
+            or error.status_code in self.retry_policy.retry_status_codes
+        )
+
+    def _send_prices(self, rows: List[Dict]) -> List[Dict]:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._update_sku_price, rows))
+
+    def _summarize_price_updates(self, results: List[Dict]) -> pd.DataFrame:
+        results_df = pd.DataFrame(results, columns=PRICE_UPDATE_COLUMNS)
+        failed_df = results_df[~results_df['success'].astype(bool)]
+        for row in failed_df.to_dict('records'):
+            plugg_to_api_logger.error(
+                f"Failed to update price of sku {row['sku (*)']}: {row['error']}"
+            )
+        plugg_to_api_logger.info(
+            f'{len(results_df) - len(failed_df)} prices updated and {len(failed_df)} failed'
+        )
+        return results_df
+
+    @benchmark_with(plugg_to_api_logger)
+    @logging_with(plugg_to_api_logger)
+    def update_prices(
+        self, pricing_df: pd.DataFrame, max_retries: int = None
+    ) -> pd.DataFrame:
+        if max_retries is None:
+            max_retries = self.max_retries
+
+        results = self._send_prices(
+            [
+                {
+                    'sku (*)': str(row['sku (*)']),
+                    'special_price': row['special_price'],
+                    'success': False,
+                    'error': None,
+                    'retryable': False,
+                    'attempts': 0,
+                    'latency': 0.0,
+                }
+                for row in pricing_df.to_dict('records')
+            ]
+        )
+        for _ in range(max_retries):
+            failed = [
+                result
+                for result in results
+                if not result['success'] and result['retryable']
+            ]
+            if not failed:
+                break
+            plugg_to_api_logger.warning(
+                f'Retrying {len(failed)} transient price update failures'
+            )
+            # rows are updated in place, so results keeps the input order
+            self._send_prices(failed)
+        return self._summarize_price_updates(results)
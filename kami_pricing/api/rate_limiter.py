@@ -0,0 +1,164 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+rate_limiter_logger = logging.getLogger('Rate Limiter')
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError(f'Rate must be positive, got {rate}')
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1):
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = None,
+        min_rate: float = None,
+        decrease_factor: float = 0.5,
+        increase_step: float = None,
+    ):
+        super().__init__(rate=rate, capacity=capacity)
+        self.max_rate = rate
+        self.min_rate = min_rate or rate / 10
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step or rate / 20
+
+    def on_throttled(self):
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            rate_limiter_logger.warning(
+                f'Throttled, slowing down to {self.rate:.2f} requests/s'
+            )
+
+    def on_success(self):
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def observe(self, status_code: int):
+        if status_code == 429:
+            self.on_throttled()
+        elif status_code < 400:
+            self.on_success()
+
+
+class HostRateLimiters:
+    def __init__(self, limits: Dict[str, Dict[str, float]] = None):
+        self.limits = dict(limits or {})
+        self.limiters: Dict[str, AdaptiveTokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _create_limiter(
+        self,
+        limit: Dict[str, float],
+        requests_per_second: float = None,
+        burst: float = None,
+    ) -> AdaptiveTokenBucket:
+        return AdaptiveTokenBucket(
+            rate=limit.get('requests_per_second', requests_per_second),
+            capacity=limit.get('burst', burst),
+            min_rate=limit.get('min_requests_per_second'),
+        )
+
+    def configure(self, limits: Dict[str, Dict[str, float]]):
+        with self._lock:
+            self.limits.update(limits)
+            for host, limit in limits.items():
+                limiter = self.limiters.get(host)
+                if limiter is None:
+                    continue
+                configured = self._create_limiter(
+                    limit, limiter.max_rate, limiter.capacity
+                )
+                # keep the rate learned by the current limiter unless the
+                # limits themselves changed
+                if (limiter.max_rate, limiter.capacity, limiter.min_rate,) != (
+                    configured.max_rate,
+                    configured.capacity,
+                    configured.min_rate,
+                ):
+                    self.limiters[host] = configured
+
+    def get(
+        self,
+        host: str,
+        requests_per_second: float = None,
+        burst: float = None,
+    ) -> AdaptiveTokenBucket | None:
+        with self._lock:
+            limit = self.limits.get(host)
+            if limit is None and not requests_per_second:
+                return None
+            if host not in self.limiters:
+                self.limiters[host] = self._create_limiter(
+                    limit or {}, requests_per_second, burst
+                )
+            return self.limiters[host]
+
+
+host_rate_limiters = HostRateLimiters()
+
+
+class SlidingWindowLimiter:
+    def __init__(self, max_requests: int, period: float = 60.0):
+        if max_requests <= 0:
+            raise ValueError(
+                f'max_requests must be positive, got {max_requests}'
+            )
+        self.max_requests = max_requests
+        self.period = period
+        self.requests = deque()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        while self.requests and now - self.requests[0] >= self.period:
+            self.requests.popleft()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._evict(now)
+                if len(self.requests) < self.max_requests:
+                    self.requests.append(now)
+                    return
+                wait = self.period - (now - self.requests[0])
+            time.sleep(wait)
@@ -0,0 +1,121 @@
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable
+
+import httpx
+
+retry_logger = logging.getLogger('Retry Policy')
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        retry_status_codes: Iterable[int] = RETRY_STATUS_CODES,
+        idempotent_methods: Iterable[str] = IDEMPOTENT_METHODS,
+    ):
+        if max_attempts < 1:
+            raise ValueError(
+                f'max_attempts must be at least 1, got {max_attempts}'
+            )
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_status_codes = frozenset(retry_status_codes)
+        self.idempotent_methods = frozenset(
+            method.upper() for method in idempotent_methods
+        )
+        self.retry_counts = Counter()
+        self._lock = threading.Lock()
+
+    def _get_endpoint_key(self, method: str, endpoint: str) -> str:
+        endpoint_path = endpoint.split('?')[0]
+        # collapse ids so counters group by route, e.g. /v2/products/{id}
+        endpoint_path = re.sub(
+            r'/(?!v\d+(?:/|$))[^/]*\d[^/]*', '/{id}', endpoint_path
+        )
+        return f'{method.upper()} {endpoint_path}'
+
+    def can_retry(self, method: str, status_code: int = None) -> bool:
+        # a 429 means the request was rejected before being processed,
+        # so it is safe to repeat even for non idempotent methods
+        if status_code == 429:
+            return True
+        if method.upper() not in self.idempotent_methods:
+            return False
+        return status_code is None or status_code in self.retry_status_codes
+
+    def get_retry_after(self, response: httpx.Response) -> float | None:
+        retry_after = response.headers.get('Retry-After')
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(
+                0.0,
+                parsedate_to_datetime(retry_after).timestamp() - time.time(),
+            )
+        except (TypeError, ValueError):
+            return None
+
+    def get_backoff(
+        self, attempt: int, response: httpx.Response = None
+    ) -> float:
+        if response is not None:
+            retry_after = self.get_retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        backoff = min(
+            self.max_backoff, self.backoff_factor * 2 ** (attempt - 1)
+        )
+        return random.uniform(backoff / 2, backoff)
+
+    def get_retry_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.retry_counts)
+
+    def send(
+        self,
+        method: str,
+        endpoint: str,
+        request: Callable[[], httpx.Response],
+    ) -> httpx.Response:
+        attempt = 1
+        while True:
+            try:
+                response = request()
+            except httpx.TransportError as e:
+                if attempt >= self.max_attempts or not self.can_retry(method):
+                    raise
+                reason = f'{type(e).__name__}: {str(e)}'
+                backoff = self.get_backoff(attempt)
+            else:
+                if (
+                    response.status_code not in self.retry_status_codes
+                    or attempt >= self.max_attempts
+                    or not self.can_retry(method, response.status_code)
+                ):
+                    return response
+                reason = f'status {response.status_code}'
+                backoff = self.get_backoff(attempt, response)
+
+            endpoint_key = self._get_endpoint_key(method, endpoint)
+            with self._lock:
+                self.retry_counts[endpoint_key] += 1
+            retry_logger.warning(
+                f'Retrying {endpoint_key} in {backoff:.2f}s after {reason} (attempt {attempt}/{self.max_attempts})'
+            )
+            time.sleep(backoff)
+            attempt += 1
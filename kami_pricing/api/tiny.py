@@ -1,5 +1,7 @@
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from os import path
 from typing import Dict, List
 
@@ -8,11 +10,20 @@ from httpx import Response
 from kami_logging import benchmark_with, logging_with
 from requests.exceptions import HTTPError, RequestException
 
+from kami_pricing.api.cache import ResponseCache, get_cache_scope
+from kami_pricing.api.http_client import create_http_client
+from kami_pricing.api.rate_limiter import (
+    HostRateLimiters,
+    SlidingWindowLimiter,
+    host_rate_limiters,
+)
+from kami_pricing.api.retry import IDEMPOTENT_METHODS, RetryPolicy
 from kami_pricing.constant import ROOT_DIR
 
 tiny_api_logger = logging.getLogger('Tiny API')
 base_url = 'https://api.tiny.com.br/api2/'
 tiny_credentials_path = path.join(ROOT_DIR, 'credentials/tiny.json')
+tiny_product_cache = ResponseCache(ttl=3600)
 
 
 class TinyAPIError(Exception):
@@ -24,11 +35,66 @@ class TinyAPI:
         self,
         base_url: str = base_url,
         credentials_path: str = tiny_credentials_path,
+        retry_policy: RetryPolicy = None,
+        requests_per_second: float = None,
+        burst: int = None,
+        rate_limiters: HostRateLimiters = host_rate_limiters,
+        requests_per_minute: int = 30,
+        max_workers: int = 4,
+        product_cache: ResponseCache = tiny_product_cache,
+        max_connections: int = 10,
+        timeout: float = 30.0,
     ):
         self.base_url = base_url
         self.credentials_path = credentials_path
         self.credentials = None
         self.result = None
+        # Tiny API v2 serves read only lookups such as
+        # produtos.pesquisa.php over POST, so POST is safe to repeat
+        self.retry_policy = retry_policy or RetryPolicy(
+            idempotent_methods=IDEMPOTENT_METHODS | {'POST'}
+        )
+        self.rate_limiter = rate_limiters.get(
+            host=httpx.URL(base_url).host,
+            requests_per_second=requests_per_second,
+            burst=burst,
+        )
+        # Tiny blocks the token for a while once the per minute quota of
+        # the plan is exceeded, so the quota is enforced before sending
+        self.quota_limiter = (
+            SlidingWindowLimiter(max_requests=requests_per_minute, period=60)
+            if requests_per_minute
+            else None
+        )
+        self.max_workers = max_workers
+        self.product_cache = product_cache
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.client = None
+        self._client_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_client(self) -> httpx.Client:
+        with self._client_lock:
+            if self.client is None:
+                self.client = create_http_client(
+                    http2=False,
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    timeout=self.timeout,
+                )
+            return self.client
+
+    def close(self):
+        with self._client_lock:
+            if self.client is not None:
+                self.client.close()
+                self.client = None
 
     @benchmark_with(tiny_api_logger)
     @logging_with(tiny_api_logger)
@@ -73,30 +139,43 @@ class TinyAPI:
 
             method = method.upper()
 
-            with httpx.Client() as client:
-                response = {
-                    'GET': lambda: client.get(
-                        base_url + endpoint, headers=headers
-                    ),
-                    'POST': lambda: client.post(
-                        base_url + endpoint, json=payload, headers=headers
-                    ),
-                    'PUT': lambda: client.put(
-                        base_url + endpoint, json=payload, headers=headers
-                    ),
-                    'DELETE': lambda: client.delete(
-                        base_url + endpoint, headers=headers
-                    ),
-                    'PATCH': lambda: client.patch(
-                        base_url + endpoint, json=payload, headers=headers
-                    ),
-                }.get(method, lambda: None)()
-
-                if response is None:
-                    raise ValueError(f'Unsupported HTTP method: {method}')
-
-                response.raise_for_status()
-                self.result = response.json()
+            client = self._get_client()
+            request = {
+                'GET': lambda: client.get(
+                    self.base_url + endpoint, headers=headers
+                ),
+                'POST': lambda: client.post(
+                    self.base_url + endpoint, data=payload, headers=headers
+                ),
+                'PUT': lambda: client.put(
+                    self.base_url + endpoint, data=payload, headers=headers
+                ),
+                'DELETE': lambda: client.delete(
+                    self.base_url + endpoint, headers=headers
+                ),
+                'PATCH': lambda: client.patch(
+                    self.base_url + endpoint, data=payload, headers=headers
+                ),
+            }.get(method)
+
+            if request is None:
+                raise ValueError(f'Unsupported HTTP method: {method}')
+
+            def send() -> Response:
+                if self.quota_limiter:
+                    self.quota_limiter.acquire()
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+                response = request()
+                if self.rate_limiter:
+                    self.rate_limiter.observe(response.status_code)
+                return response
+
+            response = self.retry_policy.send(method, endpoint, send)
+
+            response.raise_for_status()
+            self.result = response.json()
+            return self.result
 
         except httpx.HTTPStatusError as e:
             raise TinyAPIError(f'HTTP error occurred: {str(e)}')
@@ -128,21 +207,33 @@ class TinyAPI:
         except RequestException as e:
             raise RequestException(f'An request error occurred: {str(e)}')
 
+    def _get_product_or_error(self, sku: str) -> Dict:
+        try:
+            if not self.credentials:
+                self._set_credentials()
+        except TinyAPIError as e:
+            return {'sku': sku, 'error': str(e)}
+        # shared by every client, so entries are scoped to one account
+        cache_key = (
+            get_cache_scope(self.base_url, self.credentials['token']) + sku
+        )
+        product_dict = self.product_cache.get(cache_key)
+        if product_dict is not None:
+            return product_dict
+        try:
+            product_dict = self.get_product_by_sku(sku)
+        except Exception as e:
+            return {'sku': sku, 'error': str(e)}
+        if product_dict is None:
+            return {'sku': sku, 'error': 'Product not found'}
+        self.product_cache.set(cache_key, product_dict)
+        return product_dict
+
     @benchmark_with(tiny_api_logger)
     @logging_with(tiny_api_logger)
     def get_products_list_by_sku(self, sku_list: List[str]) -> List[dict]:
-        products_list = []
         try:
-            for sku in sku_list:
-                product_dict = {}
-                try:
-                    product_data = self.get_product_by_sku(sku)
-                    product_dict = product_data
-                except Exception as e:
-                    product_dict = {'sku': sku, 'error': str(e)}
-                finally:
-                    products_list.append(product_dict)
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                return list(executor.map(self._get_product_or_error, sku_list))
         except Exception as e:
             raise TinyAPIError(f'An unknown error occurred: {str(e)}')
-        finally:
-            return products_list
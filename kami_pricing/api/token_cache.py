@@ -0,0 +1,107 @@
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from os import chmod, makedirs, path
+from typing import Callable, Dict, Tuple
+
+token_cache_logger = logging.getLogger('Token Cache')
+
+
+@dataclass
+class AccessToken:
+    value: str
+    expires_at: float
+
+    def is_valid(self, refresh_margin: float = 0) -> bool:
+        return time.time() < self.expires_at - refresh_margin
+
+
+class TokenCache:
+    def __init__(self, refresh_margin: float = 300, cache_path: str = None):
+        self.refresh_margin = refresh_margin
+        self.cache_path = cache_path
+        self._tokens: Dict[str, AccessToken] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def _get_key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _read_file(self) -> Dict[str, Dict]:
+        if not self.cache_path or not path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            token_cache_logger.warning(
+                f'Ignoring unreadable token cache at {self.cache_path}: {str(e)}'
+            )
+            return {}
+
+    def _load(self, key: str) -> AccessToken | None:
+        token = self._tokens.get(key)
+        if token is None or not token.is_valid(self.refresh_margin):
+            cached = self._read_file().get(key)
+            if cached:
+                token = AccessToken(**cached)
+                self._tokens[key] = token
+        return token
+
+    def _save(self, key: str, token: AccessToken):
+        self._tokens[key] = token
+        if not self.cache_path:
+            return
+        try:
+            cache_dir = path.dirname(self.cache_path)
+            if cache_dir:
+                makedirs(cache_dir, exist_ok=True)
+            tokens = self._read_file()
+            tokens[key] = {
+                'value': token.value,
+                'expires_at': token.expires_at,
+            }
+            with open(self.cache_path, 'w') as f:
+                json.dump(tokens, f)
+            chmod(self.cache_path, 0o600)
+        except OSError as e:
+            token_cache_logger.warning(
+                f'Failed to write token cache at {self.cache_path}: {str(e)}'
+            )
+
+    def get(self, key: str, fetch: Callable[[], Tuple[str, float]]) -> str:
+        token = self._load(key)
+        if token and token.is_valid(self.refresh_margin):
+            return token.value
+
+        # single flight: concurrent callers wait for the first refresh
+        with self._get_key_lock(key):
+            token = self._load(key)
+            if token and token.is_valid(self.refresh_margin):
+                return token.value
+            value, expires_in = fetch()
+            self._save(key, AccessToken(value, time.time() + expires_in))
+            return value
+
+    def invalidate(self, key: str, if_token: str = None):
+        # with if_token, a token refreshed meanwhile by another caller is
+        # kept: only the rejected one is dropped
+        with self._get_key_lock(key):
+            if if_token is not None:
+                token = self._load(key)
+                if token is None or token.value != if_token:
+                    return
+            self._tokens.pop(key, None)
+            if self.cache_path:
+                tokens = self._read_file()
+                if tokens.pop(key, None) is not None:
+                    try:
+                        with open(self.cache_path, 'w') as f:
+                            json.dump(tokens, f)
+                    except OSError as e:
+                        token_cache_logger.warning(
+                            f'Failed to write token cache at {self.cache_path}: {str(e)}'
+                        )
@@ -3,8 +3,11 @@ import os
 SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.abspath(SOURCE_DIR + '/../')
 ID_HAIRPRO_SHEET = '1u7dCTQzbqgKSSjpSVtsUl7ea2j2YgW4Ko2nB9akE1ws'
+SKUS_STATUS_SHEET_RANGE = 'sku!A1:B'
 GOOGLE_API_CREDENTIALS = os.path.join(ROOT_DIR, 'credentials/google_api.json')
 PRICING_MANAGER_FILE = os.path.join(ROOT_DIR, 'settings/pricing_manager.json')
+PRICE_STATE_FILE = os.path.join(ROOT_DIR, 'data/price_state.sqlite')
+PAGE_CACHE_FILE = os.path.join(ROOT_DIR, 'data/page_cache.sqlite')
 COLUMNS_ALL_SELLER = [
     'sku',
     'brand',
@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from typing import TYPE_CHECKING, Dict
+
+import pandas as pd
+
+from kami_pricing.constant import ID_HAIRPRO_SHEET
+from kami_pricing.gsheet_client import get_gsheet
+
+if TYPE_CHECKING:
+    from kami_gsuite.kami_gsheet import KamiGsheet
+
+cost_table_logger = logging.getLogger('Cost Table')
+COST_COLUMNS = ['CUSTO', 'FRETE', 'INSUMO']
+_cost_tables: Dict[tuple, 'CostTable'] = {}
+_cost_tables_lock = threading.Lock()
+
+
+class CostTableError(Exception):
+    pass
+
+
+class CostTable:
+    def __init__(
+        self,
+        sheet_id: str = ID_HAIRPRO_SHEET,
+        sheet_range: str = None,
+        file_path: str = None,
+        ttl: float = 3600,
+        sku_column: str = 'sku',
+        gsheet: 'KamiGsheet' = None,
+    ):
+        if not sheet_range and not file_path:
+            raise CostTableError(
+                'Cost table needs a sheet_range or a file_path to load the costs from'
+            )
+        self.sheet_id = sheet_id
+        self.sheet_range = sheet_range
+        self.file_path = file_path
+        self.ttl = ttl
+        self.sku_column = sku_column
+        self.gsheet = gsheet
+        self.costs: pd.DataFrame | None = None
+        self.loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_sheet(self) -> pd.DataFrame:
+        gsheet = self.gsheet or get_gsheet()
+        return gsheet.convert_range_to_dataframe(
+            self.sheet_id, self.sheet_range
+        )
+
+    def _read_file(self) -> pd.DataFrame:
+        if self.file_path.endswith(('.xlsx', '.xls')):
+            return pd.read_excel(self.file_path, dtype=str)
+        # sniff the separator, exports with decimal commas use ';'
+        return pd.read_csv(
+            self.file_path, dtype=str, sep=None, engine='python'
+        )
+
+    def _normalize(self, costs: pd.DataFrame) -> pd.DataFrame:
+        missing_columns = [
+            column
+            for column in [self.sku_column, *COST_COLUMNS]
+            if column not in costs.columns
+        ]
+        if missing_columns:
+            raise CostTableError(
+                f'Cost table is missing the columns {missing_columns}'
+            )
+
+        costs = costs[[self.sku_column, *COST_COLUMNS]].rename(
+            columns={self.sku_column: 'sku (*)'}
+        )
+        costs['sku (*)'] = costs['sku (*)'].astype(str).str.strip()
+        costs[COST_COLUMNS] = costs[COST_COLUMNS].apply(
+            lambda x: pd.to_numeric(
+                x.astype(str).str.replace(',', '.', regex=False),
+                errors='coerce',
+            )
+        )
+        # first row wins, like the lookup done by the spreadsheet
+        return costs.drop_duplicates(subset='sku (*)').set_index('sku (*)')
+
+    def load(self) -> pd.DataFrame:
+        try:
+            costs = self._read_file() if self.file_path else self._read_sheet()
+        except CostTableError:
+            raise
+        except Exception as e:
+            source = self.file_path or f'{self.sheet_id} {self.sheet_range}'
+            raise CostTableError(
+                f'Failed to load cost table from {source}: {str(e)}'
+            )
+        costs = self._normalize(costs)
+        cost_table_logger.info(f'Loaded costs of {len(costs)} skus')
+        return costs
+
+    def get_costs(self, refresh: bool = False) -> pd.DataFrame:
+        with self._lock:
+            if (
+                refresh
+                or self.costs is None
+                or time.monotonic() - self.loaded_at >= self.ttl
+            ):
+                self.costs = self.load()
+                self.loaded_at = time.monotonic()
+            return self.costs
+
+    def join(self, df: pd.DataFrame) -> pd.DataFrame:
+        df_ebitda = df[['sku (*)', 'special_price']].reset_index(drop=True)
+        costs = self.get_costs().reindex(
+            df_ebitda['sku (*)'].astype(str).str.strip()
+        )
+        df_ebitda[COST_COLUMNS] = costs[COST_COLUMNS].to_numpy()
+        return df_ebitda
+
+
+def get_cost_table(**settings) -> CostTable:
+    # the service builds a new PricingManager every cycle, sharing the
+    # table keeps the loaded costs until their ttl runs out
+    key = tuple(sorted(settings.items()))
+    with _cost_tables_lock:
+        if key not in _cost_tables:
+            _cost_tables[key] = CostTable(**settings)
+        return _cost_tables[key]
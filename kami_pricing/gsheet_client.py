@@ -0,0 +1,32 @@
+import logging
+import threading
+from typing import TYPE_CHECKING
+
+from kami_pricing.constant import GOOGLE_API_CREDENTIALS
+
+if TYPE_CHECKING:
+    from kami_gsuite.kami_gsheet import KamiGsheet
+
+gsheet_client_logger = logging.getLogger('Gsheet Client')
+_gsheet = None
+_gsheet_lock = threading.Lock()
+
+
+def get_gsheet() -> 'KamiGsheet':
+    global _gsheet
+    if _gsheet is not None:
+        return _gsheet
+
+    with _gsheet_lock:
+        if _gsheet is None:
+            # the google client libraries are only imported by runs that
+            # actually talk to Sheets
+            from kami_gsuite.kami_gsheet import KamiGsheet
+
+            gsheet = KamiGsheet(
+                api_version='v4', credentials_path=GOOGLE_API_CREDENTIALS
+            )
+            gsheet.connect()
+            gsheet_client_logger.info('Connected to the Google Sheets API')
+            _gsheet = gsheet
+    return _gsheet
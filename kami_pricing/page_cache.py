@@ -0,0 +1,95 @@
+import json
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, List
+
+from kami_pricing.constant import PAGE_CACHE_FILE
+from kami_pricing.sqlite_store import SQLiteStore, chunk_parameters
+
+page_cache_logger = logging.getLogger('Page Cache')
+
+
+class PageCacheError(Exception):
+    pass
+
+
+@dataclass
+class PageSnapshot:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_hash: str
+    sellers: List[List]
+    fetched_at: float
+
+    def get_conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class PageCache(SQLiteStore):
+    schema = """
+        CREATE TABLE IF NOT EXISTS page_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT NOT NULL,
+            sellers TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        )
+    """
+    error_class = PageCacheError
+    store_name = 'page cache'
+
+    def __init__(self, db_path: str = PAGE_CACHE_FILE):
+        super().__init__(db_path=db_path)
+
+    def get_snapshots(self, urls: Iterable[str]) -> Dict[str, PageSnapshot]:
+        urls = list(dict.fromkeys(urls))
+        rows = []
+        with self._transaction() as connection:
+            for chunk in chunk_parameters(urls):
+                placeholders = ', '.join('?' * len(chunk))
+                rows += connection.execute(
+                    'SELECT url, etag, last_modified, content_hash, sellers, '
+                    f'fetched_at FROM page_cache WHERE url IN ({placeholders})',
+                    chunk,
+                ).fetchall()
+        return {
+            url: PageSnapshot(
+                url=url,
+                etag=etag,
+                last_modified=last_modified,
+                content_hash=content_hash,
+                sellers=json.loads(sellers),
+                fetched_at=fetched_at,
+            )
+            for url, etag, last_modified, content_hash, sellers, fetched_at in rows
+        }
+
+    def save_snapshots(self, snapshots: Iterable[PageSnapshot]):
+        rows = [
+            (
+                snapshot.url,
+                snapshot.etag,
+                snapshot.last_modified,
+                snapshot.content_hash,
+                json.dumps(snapshot.sellers),
+                snapshot.fetched_at,
+            )
+            for snapshot in snapshots
+        ]
+        if not rows:
+            return
+        with self._transaction() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO page_cache '
+                '(url, etag, last_modified, content_hash, sellers, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+        page_cache_logger.info(f'Saved {len(rows)} page snapshots')
@@ -0,0 +1,89 @@
+import logging
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+from kami_pricing.constant import PRICE_STATE_FILE
+from kami_pricing.sqlite_store import SQLiteStore
+
+price_state_logger = logging.getLogger('Price State')
+
+
+class PriceStateError(Exception):
+    pass
+
+
+class PriceStateStore(SQLiteStore):
+    schema = """
+        CREATE TABLE IF NOT EXISTS price_state (
+            company TEXT NOT NULL,
+            marketplace TEXT NOT NULL,
+            sku TEXT NOT NULL,
+            price REAL NOT NULL,
+            pushed_at REAL NOT NULL,
+            PRIMARY KEY (company, marketplace, sku)
+        )
+    """
+    error_class = PriceStateError
+    store_name = 'price state'
+
+    def __init__(
+        self, db_path: str = PRICE_STATE_FILE, resend_after: float = 86400
+    ):
+        super().__init__(db_path=db_path)
+        self.resend_after = resend_after
+
+    def get_last_prices(
+        self, company: str, marketplace: str
+    ) -> Dict[str, Dict[str, float]]:
+        with self._transaction() as connection:
+            rows = connection.execute(
+                'SELECT sku, price, pushed_at FROM price_state '
+                'WHERE company = ? AND marketplace = ?',
+                (company, marketplace),
+            ).fetchall()
+        return {
+            sku: {'price': price, 'pushed_at': pushed_at}
+            for sku, price, pushed_at in rows
+        }
+
+    def get_changed_prices(
+        self, company: str, marketplace: str, pricing_df: pd.DataFrame
+    ) -> pd.DataFrame:
+        last_prices = self.get_last_prices(company, marketplace)
+        if not last_prices:
+            return pricing_df
+
+        last_df = pd.DataFrame.from_dict(last_prices, orient='index')
+        skus = pricing_df['sku (*)'].astype(str)
+        last_price = skus.map(last_df['price'])
+        pushed_at = skus.map(last_df['pushed_at'])
+        unchanged = (pricing_df['special_price'].round(2) == last_price) & (
+            time.time() - pushed_at < self.resend_after
+        )
+        return pricing_df[~unchanged.to_numpy()]
+
+    def save_prices(
+        self,
+        company: str,
+        marketplace: str,
+        pricing_df: pd.DataFrame,
+    ):
+        pushed_at = time.time()
+        rows: List[tuple] = [
+            (company, marketplace, str(sku), round(float(price), 2), pushed_at)
+            for sku, price in zip(
+                pricing_df['sku (*)'], pricing_df['special_price']
+            )
+        ]
+        with self._transaction() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO price_state '
+                '(company, marketplace, sku, price, pushed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+        price_state_logger.info(
+            f'Saved {len(rows)} pushed prices for {company} on {marketplace}'
+        )
@@ -1,17 +1,21 @@
 import logging
 from os import path
+from typing import Tuple
 
 import numpy as np
 import pandas as pd
-from kami_gsuite.kami_gsheet import KamiGsheet
 from kami_logging import benchmark_with, logging_with
 
 from kami_pricing.constant import (
     COLUMNS_ALL_SELLER,
     COLUMNS_DIFERENCE,
     COLUMNS_EXCEPT_HAIRPRO,
-    GOOGLE_API_CREDENTIALS,
+    ID_HAIRPRO_SHEET,
+    SKUS_STATUS_SHEET_RANGE,
 )
+from kami_pricing.cost_table import CostTable
+from kami_pricing.gsheet_client import get_gsheet
+from kami_pricing.sheet_snapshot import SheetSnapshot
 
 pricing_logger = logging.getLogger('pricing')
 
@@ -24,12 +28,21 @@ class Pricing:
         multiplier_reverse: float = 0.003,
         limit_rate_ebitda: float = 3.99,
         increment_price_new: float = 0.10,
+        solver: str = 'vectorized',
+        matching_engine: str = 'merge',
+        sheet_snapshot: SheetSnapshot = None,
+        cost_table: CostTable = None,
     ):
         self.multiplier_commission = multiplier_commission
         self.multiplier_admin = multiplier_admin
         self.multiplier_reverse = multiplier_reverse
         self.limit_rate_ebitda = limit_rate_ebitda
         self.increment_price_new = increment_price_new
+        self.solver = solver
+        self.matching_engine = matching_engine
+        self.sheet_snapshot = sheet_snapshot
+        self.cost_table = cost_table
+        self.inactive_skus: frozenset | None = None
 
     def calc_ebitda(self, df: pd.DataFrame) -> pd.DataFrame:
         try:
@@ -63,6 +76,120 @@ class Pricing:
             pricing_logger.error(f'An unexpected error occurred: {str(e)}')
             return None
 
+    def _price_components(
+        self,
+        price: np.ndarray,
+        cost: np.ndarray,
+        freight: np.ndarray,
+        supplies: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        commission = np.round(price * self.multiplier_commission, 2)
+        admin = np.round(price * self.multiplier_admin, 2)
+        reverse = np.round(price * self.multiplier_reverse, 2)
+        # same subtraction order as the iterative solver, so both paths
+        # produce bit-identical floats
+        ebitda = (
+            price - cost - commission - freight - admin - supplies - reverse
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ebitda_rate = np.round(ebitda / price, 2) * 100
+        return commission, admin, reverse, ebitda, ebitda_rate
+
+    def _solve_prices_iteratively(self, df: pd.DataFrame) -> pd.DataFrame:
+        for idx in range(0, len(df['special_price'])):
+            while df.loc[idx, 'EBITDA %'] < self.limit_rate_ebitda:
+                df.loc[idx, 'special_price'] += self.increment_price_new
+                df.loc[idx, 'COMISSÃO'] = round(
+                    df.loc[idx, 'special_price'] * self.multiplier_commission,
+                    2,
+                )
+                df.loc[idx, 'ADMIN'] = round(
+                    df.loc[idx, 'special_price'] * self.multiplier_admin,
+                    2,
+                )
+                df.loc[idx, 'REVERSA'] = round(
+                    df.loc[idx, 'special_price'] * self.multiplier_reverse,
+                    2,
+                )
+                df.loc[idx, 'EBITDA R$'] = (
+                    df.loc[idx, 'special_price']
+                    - df.loc[idx, 'CUSTO']
+                    - df.loc[idx, 'COMISSÃO']
+                    - df.loc[idx, 'FRETE']
+                    - df.loc[idx, 'ADMIN']
+                    - df.loc[idx, 'INSUMO']
+                    - df.loc[idx, 'REVERSA']
+                )
+                df.loc[idx, 'EBITDA %'] = (
+                    round(
+                        df.loc[idx, 'EBITDA R$']
+                        / df.loc[idx, 'special_price'],
+                        2,
+                    )
+                    * 100
+                )
+            else:
+                pricing_logger.info(
+                    f"The sku {df.loc[idx, 'sku (*)']} with a price of {df.loc[idx, 'special_price']} has an ebitda of {df.loc[idx, 'EBITDA %']}"
+                )
+        return df
+
+    def _solve_prices_vectorized(self, df: pd.DataFrame) -> pd.DataFrame:
+        below_floor = (df['EBITDA %'] < self.limit_rate_ebitda).to_numpy()
+        if not below_floor.any():
+            return df
+
+        price = df.loc[below_floor, 'special_price'].to_numpy(dtype=float)
+        cost = df.loc[below_floor, 'CUSTO'].to_numpy(dtype=float)
+        freight = df.loc[below_floor, 'FRETE'].to_numpy(dtype=float)
+        supplies = df.loc[below_floor, 'INSUMO'].to_numpy(dtype=float)
+
+        # Each rounded fee is at most 0.005 below its exact value and the
+        # rounded EBITDA % at most 0.5 points above the exact rate, so this
+        # margin gives a price below which the floor can never be reached.
+        margin = (
+            1
+            - self.multiplier_commission
+            - self.multiplier_admin
+            - self.multiplier_reverse
+            - self.limit_rate_ebitda / 100
+            + 0.005
+        )
+        if margin <= 0:
+            raise ValueError(
+                f'EBITDA floor of {self.limit_rate_ebitda}% is unreachable with the given multipliers'
+            )
+        lower_bound_price = (cost + freight + supplies - 0.015) / margin
+        steps = np.floor(
+            (lower_bound_price - price) / self.increment_price_new
+        )
+        steps = np.clip(steps - 1, 1, None).astype(np.int64)
+
+        # The iterative solver accumulates the increment one step at a time,
+        # replay that accumulation to land on the exact same floats.
+        for step in range(int(steps.max())):
+            pending = steps > step
+            price[pending] += self.increment_price_new
+
+        components = self._price_components(price, cost, freight, supplies)
+        pending = components[-1] < self.limit_rate_ebitda
+        while pending.any():
+            price[pending] += self.increment_price_new
+            components = self._price_components(price, cost, freight, supplies)
+            pending = components[-1] < self.limit_rate_ebitda
+
+        commission, admin, reverse, ebitda, ebitda_rate = components
+        df.loc[below_floor, 'special_price'] = price
+        df.loc[below_floor, 'COMISSÃO'] = commission
+        df.loc[below_floor, 'ADMIN'] = admin
+        df.loc[below_floor, 'REVERSA'] = reverse
+        df.loc[below_floor, 'EBITDA R$'] = ebitda
+        df.loc[below_floor, 'EBITDA %'] = ebitda_rate
+        pricing_logger.info(
+            f'{below_floor.sum()} of {len(df)} skus were repriced to reach an ebitda of {self.limit_rate_ebitda}%'
+        )
+        return df
+
     @benchmark_with(pricing_logger)
     @logging_with(pricing_logger)
     def pricing(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -71,78 +198,21 @@ class Pricing:
             return None
 
         try:
-            for idx in range(0, len(df['special_price'])):
-                while df.loc[idx, 'EBITDA %'] < self.limit_rate_ebitda:
-                    df.loc[idx, 'special_price'] += self.increment_price_new
-                    df.loc[idx, 'COMISSÃO'] = round(
-                        df.loc[idx, 'special_price']
-                        * self.multiplier_commission,
-                        2,
-                    )
-                    df.loc[idx, 'ADMIN'] = round(
-                        df.loc[idx, 'special_price'] * self.multiplier_admin,
-                        2,
-                    )
-                    df.loc[idx, 'REVERSA'] = round(
-                        df.loc[idx, 'special_price'] * self.multiplier_reverse,
-                        2,
-                    )
-                    df.loc[idx, 'EBITDA R$'] = (
-                        df.loc[idx, 'special_price']
-                        - df.loc[idx, 'CUSTO']
-                        - df.loc[idx, 'COMISSÃO']
-                        - df.loc[idx, 'FRETE']
-                        - df.loc[idx, 'ADMIN']
-                        - df.loc[idx, 'INSUMO']
-                        - df.loc[idx, 'REVERSA']
-                    )
-                    df.loc[idx, 'EBITDA %'] = (
-                        round(
-                            df.loc[idx, 'EBITDA R$']
-                            / df.loc[idx, 'special_price'],
-                            2,
-                        )
-                        * 100
-                    )
-                else:
-                    pricing_logger.info(
-                        f"The sku {df.loc[idx, 'sku (*)']} with a price of {df.loc[idx, 'special_price']} has an ebitda of {df.loc[idx, 'EBITDA %']}"
-                    )
-            return df
+            if self.solver == 'vectorized':
+                return self._solve_prices_vectorized(df)
+            elif self.solver == 'iterative':
+                return self._solve_prices_iteratively(df)
+            raise ValueError(f'Unsupported pricing solver: {self.solver}')
         except Exception as e:
             pricing_logger.error(f'An unexpected error occurred: {str(e)}')
             return None
 
-    @benchmark_with(pricing_logger)
-    @logging_with(pricing_logger)
-    def create_dataframes(self, sellers_list, skus_list) -> pd.DataFrame:
-        df_sellers_df_list = pd.DataFrame(
-            sellers_list, columns=COLUMNS_ALL_SELLER
-        )
-        skus_df = pd.DataFrame(skus_list)
-        df_sellers_df_list.drop_duplicates(keep='first', inplace=True)
-        df_sellers_df_list['seller_name'] = df_sellers_df_list[
-            'seller_name'
-        ].astype(str)
-        hairpro_df = df_sellers_df_list.loc[
-            df_sellers_df_list['seller_name'] == 'HAIRPRO'
-        ]
-        except_hairpro_df = df_sellers_df_list.drop(
-            df_sellers_df_list[
-                df_sellers_df_list['seller_name'].str.contains('HAIRPRO')
-            ].index
-        )
-        except_hairpro_df = pd.DataFrame(
-            except_hairpro_df, columns=COLUMNS_EXCEPT_HAIRPRO
-        )
-
-        sugest_price = except_hairpro_df.groupby('sku')['price'].idxmin()
-        except_hairpro_df = except_hairpro_df.loc[sugest_price]
-
-        difference_price_df = pd.DataFrame(
-            hairpro_df, columns=COLUMNS_DIFERENCE
-        )
-
+    def _match_competitors_legacy(
+        self,
+        difference_price_df: pd.DataFrame,
+        hairpro_df: pd.DataFrame,
+        except_hairpro_df: pd.DataFrame,
+    ) -> pd.DataFrame:
         for i in hairpro_df['sku']:
             for j in except_hairpro_df['sku']:
                 if i == j:
@@ -190,6 +260,107 @@ class Pricing:
                 difference_price_df['ganho_%'] = (
                     difference_price_df['ganho_%'].round(2) * 100
                 )
+        return difference_price_df
+
+    def _match_competitors(
+        self,
+        difference_price_df: pd.DataFrame,
+        except_hairpro_df: pd.DataFrame,
+    ) -> pd.DataFrame:
+        if difference_price_df.empty or except_hairpro_df.empty:
+            return difference_price_df
+
+        competitors = except_hairpro_df[['sku', 'price']].rename(
+            columns={'price': 'competitor_price'}
+        )
+        matches = difference_price_df[['sku']].merge(
+            competitors, on='sku', how='left'
+        )
+        difference_price_df['competitor_price'] = matches[
+            'competitor_price'
+        ].to_numpy(dtype=float)
+        difference_price_df['difference_price'] = (
+            difference_price_df['competitor_price']
+            - difference_price_df['price']
+            - 0.10
+        ).round(6)
+
+        # the legacy loop re-evaluates both rules on every iteration. The
+        # competitor rule wins when any hairpro price is below any
+        # competitor price. Otherwise hairpro keeps its own prices, unless
+        # every row is the sku matched in the first iteration: then no
+        # price is suggested and the rows are dropped later
+        first_sku = difference_price_df['sku'].iloc[0]
+        first_iteration_matched = (difference_price_df['sku'] == first_sku) & (
+            first_sku == except_hairpro_df['sku'].iloc[0]
+        )
+        if (
+            difference_price_df['price'].min()
+            < difference_price_df['competitor_price'].max()
+        ):
+            difference_price_df['suggest_price'] = (
+                difference_price_df['competitor_price'].round(6) - 0.10
+            )
+        elif (
+            difference_price_df['competitor_price']
+            .where(first_iteration_matched)
+            .isnull()
+            .values.any()
+        ):
+            difference_price_df['suggest_price'] = difference_price_df[
+                'price'
+            ].round(6)
+
+        difference_price_df['ganho_%'] = (
+            difference_price_df['suggest_price'] / difference_price_df['price']
+        ) - 1
+        difference_price_df['ganho_%'] = (
+            difference_price_df['ganho_%'].round(2) * 100
+        )
+        return difference_price_df
+
+    @benchmark_with(pricing_logger)
+    @logging_with(pricing_logger)
+    def create_dataframes(self, sellers_list, skus_list) -> pd.DataFrame:
+        df_sellers_df_list = pd.DataFrame(
+            sellers_list, columns=COLUMNS_ALL_SELLER
+        )
+        skus_df = pd.DataFrame(skus_list)
+        df_sellers_df_list.drop_duplicates(keep='first', inplace=True)
+        df_sellers_df_list['seller_name'] = df_sellers_df_list[
+            'seller_name'
+        ].astype(str)
+        hairpro_df = df_sellers_df_list.loc[
+            df_sellers_df_list['seller_name'] == 'HAIRPRO'
+        ]
+        except_hairpro_df = df_sellers_df_list.drop(
+            df_sellers_df_list[
+                df_sellers_df_list['seller_name'].str.contains('HAIRPRO')
+            ].index
+        )
+        except_hairpro_df = pd.DataFrame(
+            except_hairpro_df, columns=COLUMNS_EXCEPT_HAIRPRO
+        )
+
+        sugest_price = except_hairpro_df.groupby('sku')['price'].idxmin()
+        except_hairpro_df = except_hairpro_df.loc[sugest_price]
+
+        difference_price_df = pd.DataFrame(
+            hairpro_df, columns=COLUMNS_DIFERENCE
+        )
+
+        if self.matching_engine == 'merge':
+            difference_price_df = self._match_competitors(
+                difference_price_df, except_hairpro_df
+            )
+        elif self.matching_engine == 'legacy':
+            difference_price_df = self._match_competitors_legacy(
+                difference_price_df, hairpro_df, except_hairpro_df
+            )
+        else:
+            raise ValueError(
+                f'Unsupported matching engine: {self.matching_engine}'
+            )
 
         sku_sellers = skus_df.rename(
             columns={'SKU Seller': 'sku_kami', 'SKU Beleza': 'sku'}
@@ -209,10 +380,10 @@ class Pricing:
     @benchmark_with(pricing_logger)
     @logging_with(pricing_logger)
     def ebitda_proccess(self, df: pd.DataFrame):
-        kg = KamiGsheet(
-            api_version='v4',
-            credentials_path=GOOGLE_API_CREDENTIALS,
-        )
+        if self.cost_table is not None:
+            return self.cost_table.join(df)
+
+        kg = get_gsheet()
         kg.clear_range(
             '1u7dCTQzbqgKSSjpSVtsUl7ea2j2YgW4Ko2nB9akE1ws', 'ebit!A2:B'
         )
@@ -237,25 +408,29 @@ class Pricing:
 
         return df_ebitda
 
-    def drop_inactives(self, df: pd.DataFrame):
-        kg = KamiGsheet(
-            api_version='v4',
-            credentials_path=GOOGLE_API_CREDENTIALS,
+    def _get_skus_status(self) -> pd.DataFrame:
+        if self.sheet_snapshot is not None:
+            return self.sheet_snapshot.get_dataframe(SKUS_STATUS_SHEET_RANGE)
+        kg = get_gsheet()
+        return kg.convert_range_to_dataframe(
+            ID_HAIRPRO_SHEET, SKUS_STATUS_SHEET_RANGE
         )
 
-        df_active = kg.convert_range_to_dataframe(
-            '1u7dCTQzbqgKSSjpSVtsUl7ea2j2YgW4Ko2nB9akE1ws', 'sku!A1:B'
-        )
+    def get_inactive_skus(self, refresh: bool = False) -> frozenset:
+        # loaded once per run, both drop_inactives calls share it
+        if self.inactive_skus is None or refresh:
+            df_status = self._get_skus_status()
+            self.inactive_skus = frozenset(
+                df_status.loc[df_status['status'] == 'INATIVO', 'sku']
+            )
+        return self.inactive_skus
 
-        df_inactives = df_active.loc[df_active['status'] == 'INATIVO']
+    def drop_inactives(self, df: pd.DataFrame):
+        inactive_skus = self.get_inactive_skus()
 
         try:
-            to_drop_pricing = []
-            for sku in df_inactives['sku']:
-                to_drop_pricing.extend(df.loc[df['sku (*)'] == sku].index)
-            df = df.drop(to_drop_pricing)
-
-            return df
+            inactives = df['sku (*)'].isin(inactive_skus)
+            return df[~inactives.to_numpy()]
         except Exception as e:
             pricing_logger.exception(str(e))
             return None
@@ -1,23 +1,29 @@
 import json
 import logging
 from os import path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 import pandas as pd
-from kami_gsuite.kami_gsheet import KamiGsheet
 from kami_logging import benchmark_with, logging_with
 
 from kami_pricing.api.anymarket import AnymarketAPI
 from kami_pricing.api.plugg_to import PluggToAPI
+from kami_pricing.api.rate_limiter import host_rate_limiters
 from kami_pricing.constant import (
-    GOOGLE_API_CREDENTIALS,
     ID_HAIRPRO_SHEET,
+    PAGE_CACHE_FILE,
+    PRICE_STATE_FILE,
     ROOT_DIR,
+    SKUS_STATUS_SHEET_RANGE,
 )
+from kami_pricing.cost_table import get_cost_table
+from kami_pricing.gsheet_client import get_gsheet
+from kami_pricing.page_cache import PageCache
+from kami_pricing.price_state import PriceStateStore
 from kami_pricing.pricing import Pricing
 from kami_pricing.scraper import Scraper
+from kami_pricing.sheet_snapshot import SheetSnapshot
 
-gsheet = KamiGsheet(api_version='v4', credentials_path=GOOGLE_API_CREDENTIALS)
 pricing_logger = logging.getLogger('Pricing Manager')
 
 
@@ -33,6 +39,12 @@ class PricingManager:
         integrator: str = 'PLUGG_TO',
         products_ulrs_sheet_name: str = 'pricing',
         skus_sellers_sheet_name: str = 'skushairpro',
+        skip_unchanged_prices: bool = True,
+        price_state_path: str = PRICE_STATE_FILE,
+        rate_limits: Dict[str, Dict[str, float]] = None,
+        page_cache_path: str = PAGE_CACHE_FILE,
+        parse_workers: int = 1,
+        cost_table: Dict = None,
     ):
         self.company = company
         self.marketplace = marketplace
@@ -40,6 +52,20 @@ class PricingManager:
         self.skus_sellers_sheet_name = skus_sellers_sheet_name
         self.integrator = integrator
         self.integrator_api = None
+        self.price_state = (
+            PriceStateStore(db_path=price_state_path)
+            if skip_unchanged_prices
+            else None
+        )
+        self.update_counters = {'sent': 0, 'skipped': 0}
+        self.page_cache = (
+            PageCache(db_path=page_cache_path) if page_cache_path else None
+        )
+        self.parse_workers = parse_workers
+        self.sheet_snapshot = None
+        self.cost_table = get_cost_table(**cost_table) if cost_table else None
+        if rate_limits:
+            host_rate_limiters.configure(rate_limits)
 
     @classmethod
     def from_json(cls, file_path: str):
@@ -55,6 +81,10 @@ class PricingManager:
         skus_sellers_sheet_name = json_data.get(
             'skus_sellers_sheet_name', 'skushairpro'
         )
+        skip_unchanged_prices = json_data.get('skip_unchanged_prices', True)
+        rate_limits = json_data.get('rate_limits')
+        parse_workers = json_data.get('parse_workers', 1)
+        cost_table = json_data.get('cost_table')
 
         if not all(
             [
@@ -75,6 +105,10 @@ class PricingManager:
             integrator=integrator,
             products_ulrs_sheet_name=products_ulrs_sheet_name,
             skus_sellers_sheet_name=skus_sellers_sheet_name,
+            skip_unchanged_prices=skip_unchanged_prices,
+            rate_limits=rate_limits,
+            parse_workers=parse_workers,
+            cost_table=cost_table,
         )
 
     def _set_integrator_api(self):
@@ -92,7 +126,11 @@ class PricingManager:
                     credentials_path=path.join(
                         ROOT_DIR,
                         f'credentials/anymarket_{self.company.lower()}.json',
-                    )
+                    ),
+                    catalog_snapshot_path=path.join(
+                        ROOT_DIR,
+                        f'data/anymarket_catalog_{self.company.lower()}.json',
+                    ),
                 )
             elif self.integrator.upper() == 'PLUGG_TO':
                 self.integrator_api = PluggToAPI(
@@ -110,18 +148,32 @@ class PricingManager:
             pricing_logger.exception(str(e))
             raise
 
+    def _get_sheet_ranges(self) -> Dict[str, str]:
+        return {
+            'products_urls': f'{self.products_ulrs_sheet_name}!A1:A',
+            'skus_sellers': f'{self.skus_sellers_sheet_name}!A1:B',
+            'skus_status': SKUS_STATUS_SHEET_RANGE,
+        }
+
+    def _load_sheet_snapshot(self, sheet_id: str) -> SheetSnapshot:
+        # every range used in a run comes from one batchGet request
+        self.sheet_snapshot = SheetSnapshot(
+            gsheet=get_gsheet(),
+            sheet_id=sheet_id,
+            ranges=list(self._get_sheet_ranges().values()),
+        ).load()
+        return self.sheet_snapshot
+
     def _get_products_from_gsheet(
         self, sheet_id: str = ID_HAIRPRO_SHEET
     ) -> Tuple[List[str], pd.DataFrame]:
         try:
-            urls = gsheet.convert_range_to_dataframe(
-                sheet_id=sheet_id,
-                sheet_range=f'{self.products_ulrs_sheet_name}!A1:A',
-            )
+            sheet_ranges = self._get_sheet_ranges()
+            sheet_snapshot = self._load_sheet_snapshot(sheet_id)
+            urls = sheet_snapshot.get_dataframe(sheet_ranges['products_urls'])
             urls = list(urls['urls'])
-            sku_sellers = gsheet.convert_range_to_dataframe(
-                sheet_id=sheet_id,
-                sheet_range=f'{self.skus_sellers_sheet_name}!A1:B',
+            sku_sellers = sheet_snapshot.get_dataframe(
+                sheet_ranges['skus_sellers']
             )
             sku_sellers = sku_sellers.rename(
                 columns={0: 'SKU Seller', 1: 'SKU Beleza'}
@@ -141,9 +193,14 @@ class PricingManager:
     def scraping_and_pricing(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
         try:
             products_urls, products_skus = self.get_products_from_company()
-            pc = Pricing()
+            pc = Pricing(
+                sheet_snapshot=self.sheet_snapshot, cost_table=self.cost_table
+            )
             sc = Scraper(
-                marketplace=self.marketplace, products_urls=products_urls
+                marketplace=self.marketplace,
+                products_urls=products_urls,
+                page_cache=self.page_cache,
+                parse_workers=self.parse_workers,
             )
             sellers_list = sc.scrap_products_from_marketplace()
             pricing_df = pc.create_dataframes(
@@ -167,6 +224,39 @@ class PricingManager:
             pricing_logger.exception(str(e))
             raise
 
+    def _get_changed_prices(self, pricing_df: pd.DataFrame) -> pd.DataFrame:
+        changed_df = pricing_df
+        if self.price_state:
+            changed_df = self.price_state.get_changed_prices(
+                company=self.company,
+                marketplace=self.marketplace,
+                pricing_df=pricing_df,
+            )
+        self.update_counters = {
+            'sent': len(changed_df),
+            'skipped': len(pricing_df) - len(changed_df),
+        }
+        pricing_logger.info(
+            f"Sending {self.update_counters['sent']} changed prices and skipping {self.update_counters['skipped']} unchanged"
+        )
+        return changed_df
+
+    def _save_pushed_prices(
+        self, changed_df: pd.DataFrame, result: pd.DataFrame = None
+    ):
+        if not self.price_state:
+            return
+        pushed_df = changed_df
+        if isinstance(result, pd.DataFrame):
+            pushed_df = result.loc[
+                result['success'].astype(bool), ['sku (*)', 'special_price']
+            ]
+        self.price_state.save_prices(
+            company=self.company,
+            marketplace=self.marketplace,
+            pricing_df=pushed_df,
+        )
+
     @benchmark_with(pricing_logger)
     @logging_with(pricing_logger)
     def update_prices(self, pricing_df: pd.DataFrame):
@@ -174,19 +264,41 @@ class PricingManager:
             if not self.integrator_api:
                 self._set_integrator_api()
 
+            changed_df = self._get_changed_prices(pricing_df)
+            if changed_df.empty:
+                return None
+
             if self.integrator == 'PLUGG_TO':
-                self.integrator_api.update_prices(pricing_df=pricing_df)
+                with self.integrator_api:
+                    result = self.integrator_api.update_prices(
+                        pricing_df=changed_df
+                    )
 
             elif self.integrator == 'ANYMARKET':
-                self.integrator_api.update_prices_on_marketplace(
-                    pricing_df=pricing_df, marketplace=self.marketplace
-                )
+                with self.integrator_api:
+                    result = self.integrator_api.update_prices_on_marketplace(
+                        pricing_df=changed_df, marketplace=self.marketplace
+                    )
 
             else:
                 raise PricingManagerError(
                     f'Unsupported integrator: {self.integrator}'
                 )
 
+            self._save_pushed_prices(changed_df, result)
+            retry_counts = self.integrator_api.retry_policy.get_retry_counts()
+            if retry_counts:
+                pricing_logger.info(f'Retries per endpoint: {retry_counts}')
+            # PluggTo only writes prices, so it has no response cache
+            response_cache = getattr(
+                self.integrator_api, 'response_cache', None
+            )
+            if response_cache is not None:
+                pricing_logger.info(
+                    f'Response cache: {response_cache.get_metrics()}'
+                )
+            return result
+
         except Exception as e:
             pricing_logger.exception(str(e))
             raise
@@ -1,12 +1,22 @@
+import asyncio
+import hashlib
 import json
 import logging
-from typing import List
+import re
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import replace
+from html.parser import HTMLParser
+from typing import ContextManager, Dict, List, Tuple
+from urllib.parse import urlparse
 
+import aiohttp
 import numpy as np
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-from kami_gsuite.kami_gsheet import KamiGsheet
 from kami_logging import benchmark_with, logging_with
 
 from kami_pricing.constant import (
@@ -14,8 +24,185 @@ from kami_pricing.constant import (
     COLUMNS_DIFERENCE,
     COLUMNS_EXCEPT_HAIRPRO,
 )
+from kami_pricing.page_cache import PageCache, PageSnapshot
 
 scraper_logger = logging.getLogger('scraper')
+scraper_headers = {
+    'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:79.0) Gecko/20100101 Firefox/79.0'
+}
+
+SELLER_BUTTON_CLASS = 'btn btn-block btn-primary btn-lg js-add-to-cart'
+# opening <a> tags, allowing '>' inside quoted attribute values
+anchor_tag_pattern = re.compile(
+    r'<a\s(?:[^>"\']|"[^"]*"|\'[^\']*\')*>', re.IGNORECASE
+)
+script_pattern = re.compile(
+    r'<!--.*?-->|<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL
+)
+
+
+class TagAttributesParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.attrs = {}
+
+    def handle_starttag(self, tag, attrs):
+        self.attrs = dict(attrs)
+
+    @classmethod
+    def parse(cls, tag: str) -> Dict[str, str | None]:
+        parser = cls()
+        parser.feed(tag)
+        parser.close()
+        return parser.attrs
+
+
+def build_seller_row(data_sku: str) -> List:
+    row = json.loads(data_sku)[0]
+
+    scraper_logger.info(
+        f"Extraindo dados do vendedor Id: {row['seller']['id']} \
+            | Loja: {row['seller']['name']} "
+    )
+
+    return [
+        row['sku'],
+        row['brand'],
+        row['category'],
+        row['name'],
+        row['price'],
+        row['seller']['name'],
+    ]
+
+
+def extract_sellers_with_soup(content: bytes) -> List[List]:
+    soup = BeautifulSoup(content, 'html.parser')
+    id_sellers = soup.find_all('a', class_=SELLER_BUTTON_CLASS)
+    return [
+        build_seller_row(id_seller.get('data-sku')) for id_seller in id_sellers
+    ]
+
+
+def extract_sellers_fast(content: bytes) -> List[List]:
+    try:
+        page = content.decode('utf-8')
+    except UnicodeDecodeError:
+        return extract_sellers_with_soup(content)
+
+    # skip the tree building: only the <a> tags of the buy buttons
+    # are tokenized, comments and scripts are dropped like html.parser does
+    if 'js-add-to-cart' not in page:
+        return []
+    page = script_pattern.sub('', page)
+    sellers_list = []
+    for match in anchor_tag_pattern.finditer(page):
+        tag = match.group()
+        if 'js-add-to-cart' not in tag:
+            continue
+        attrs = TagAttributesParser.parse(tag)
+        if ' '.join((attrs.get('class') or '').split()) != (
+            SELLER_BUTTON_CLASS
+        ):
+            continue
+        sellers_list.append(build_seller_row(attrs.get('data-sku')))
+    return sellers_list
+
+
+def extract_sellers(content: bytes, html_parser: str = 'fast') -> List[List]:
+    if html_parser == 'fast':
+        return extract_sellers_fast(content)
+    if html_parser == 'soup':
+        return extract_sellers_with_soup(content)
+    raise ValueError(f'Unsupported html parser: {html_parser}')
+
+
+def extract_sellers_chunk(
+    pages: List[bytes], html_parser: str = 'fast'
+) -> List[List[List]]:
+    # runs in the parsing processes, one call per chunk of pages
+    return [extract_sellers(content, html_parser) for content in pages]
+
+
+def is_successful_page(status: int | None, content: bytes | None) -> bool:
+    return content is not None and status is not None and 200 <= status < 300
+
+
+def is_transient_failure(status: int | None) -> bool:
+    # network errors come back without a status
+    return status is None or status == 429 or status >= 500
+
+
+class ParsingStage:
+    def __init__(
+        self,
+        executor: Executor | None,
+        html_parser: str = 'fast',
+        chunk_size: int = 16,
+    ):
+        self.executor = executor
+        self.html_parser = html_parser
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_keys: List = []
+        self.chunk_pages: List[bytes] = []
+        self.futures: List[Tuple[List, Future]] = []
+
+    def submit(self, key, content: bytes):
+        if self.executor is None:
+            return
+        self.chunk_keys.append(key)
+        self.chunk_pages.append(content)
+        if len(self.chunk_pages) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.chunk_pages:
+            return
+        self.futures.append(
+            (
+                self.chunk_keys,
+                self.executor.submit(
+                    extract_sellers_chunk, self.chunk_pages, self.html_parser
+                ),
+            )
+        )
+        self.chunk_keys, self.chunk_pages = [], []
+
+    def _collect(self, chunks_sellers: List[List[List[List]]]) -> Dict:
+        return {
+            key: sellers
+            for (keys, _), chunk_sellers in zip(self.futures, chunks_sellers)
+            for key, sellers in zip(keys, chunk_sellers)
+        }
+
+    def get_results(self) -> Dict:
+        self.flush()
+        return self._collect([future.result() for _, future in self.futures])
+
+    async def get_results_async(self) -> Dict:
+        self.flush()
+        return self._collect(
+            await asyncio.gather(
+                *(asyncio.wrap_future(future) for _, future in self.futures)
+            )
+        )
+
+
+class HostRateLimiter:
+    def __init__(self, requests_per_second: float = 0):
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self.next_slots: Dict[str, float] = {}
+        self.lock = asyncio.Lock()
+
+    async def wait(self, host: str):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self.lock:
+            now = loop.time()
+            slot = max(now, self.next_slots.get(host, now))
+            self.next_slots[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
 
 
 class Scraper:
@@ -23,52 +210,291 @@ class Scraper:
         self,
         marketplace: str = 'BELEZA_NA_WEB',
         products_urls: List[str] = None,
+        engine: str = 'async',
+        max_concurrency: int = 10,
+        requests_per_host: float = 5.0,
+        timeout: float = 30.0,
+        page_cache: PageCache = None,
+        html_parser: str = 'fast',
+        parse_workers: int = 1,
+        parse_chunk_size: int = 16,
+        max_snapshot_age: float = 86400,
     ):
         self.marketplace = marketplace
         self.products_urls = products_urls
+        self.engine = engine
+        self.max_concurrency = max_concurrency
+        self.requests_per_host = requests_per_host
+        self.timeout = timeout
+        self.page_cache = page_cache
+        self.html_parser = html_parser
+        self.parse_workers = parse_workers
+        self.parse_chunk_size = parse_chunk_size
+        self.max_snapshot_age = max_snapshot_age
+        self.page_snapshots: Dict[str, PageSnapshot] = {}
+        self.updated_snapshots: List[PageSnapshot] = []
+        self.page_stats = {
+            'parsed': 0,
+            'unchanged': 0,
+            'not_modified': 0,
+            'failed': 0,
+        }
+
+    def _extract_sellers(self, content: bytes) -> List[List]:
+        return extract_sellers(content, self.html_parser)
+
+    def _get_parse_executor(self) -> ContextManager[Executor | None]:
+        if self.parse_workers <= 1:
+            return nullcontext()
+        return ProcessPoolExecutor(max_workers=self.parse_workers)
+
+    def _needs_parsing(
+        self, url: str, status: int | None, content: bytes | None
+    ) -> bool:
+        if not is_successful_page(status, content):
+            return False
+        snapshot = self.page_snapshots.get(url)
+        if snapshot is None:
+            return True
+        return snapshot.content_hash != hashlib.sha256(content).hexdigest()
+
+    def _load_page_snapshots(self):
+        self.updated_snapshots = []
+        self.page_stats = dict.fromkeys(self.page_stats, 0)
+        self.page_snapshots = (
+            self.page_cache.get_snapshots(self.products_urls)
+            if self.page_cache
+            else {}
+        )
+
+    def _save_page_snapshots(self):
+        scraper_logger.info(
+            f"Pages parsed: {self.page_stats['parsed']} | unchanged: {self.page_stats['unchanged']} | not modified: {self.page_stats['not_modified']} | failed: {self.page_stats['failed']}"
+        )
+        if self.page_cache:
+            self.page_cache.save_snapshots(self.updated_snapshots)
+
+    def _get_request_headers(self, url: str) -> Dict[str, str]:
+        snapshot = self.page_snapshots.get(url)
+        if snapshot is None:
+            return {}
+        return snapshot.get_conditional_headers()
+
+    def _resolve_page(
+        self,
+        url: str,
+        status: int | None,
+        content: bytes | None,
+        headers: Dict[str, str],
+        sellers: List[List] = None,
+    ) -> List[List]:
+        snapshot = self.page_snapshots.get(url)
+        if status == 304 and snapshot is not None:
+            self.page_stats['not_modified'] += 1
+            if self.page_cache:
+                # the sellers were just confirmed, keep them fresh
+                self.updated_snapshots.append(
+                    replace(snapshot, fetched_at=time.time())
+                )
+            return snapshot.sellers
+        if not is_successful_page(status, content):
+            self.page_stats['failed'] += 1
+            if status is not None:
+                scraper_logger.warning(
+                    f'Failed to scrape {url}: status {status}'
+                )
+            # throttled or failing pages would price these skus as having
+            # no sellers, recent sellers are safer. A page that is gone
+            # (404, 410) really has no sellers left
+            if (
+                snapshot is not None
+                and is_transient_failure(status)
+                and time.time() - snapshot.fetched_at <= self.max_snapshot_age
+            ):
+                return snapshot.sellers
+            return []
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        if snapshot is not None and snapshot.content_hash == content_hash:
+            self.page_stats['unchanged'] += 1
+            sellers = snapshot.sellers
+        else:
+            self.page_stats['parsed'] += 1
+            if sellers is None:
+                sellers = self._extract_sellers(content)
+
+        if self.page_cache and status == 200:
+            self.updated_snapshots.append(
+                PageSnapshot(
+                    url=url,
+                    etag=headers.get('ETag'),
+                    last_modified=headers.get('Last-Modified'),
+                    content_hash=content_hash,
+                    sellers=sellers,
+                    fetched_at=time.time(),
+                )
+            )
+        return sellers
 
     @benchmark_with(scraper_logger)
     @logging_with(scraper_logger)
     def scrap_products_from_beleza_na_web(self) -> List[str]:
         sellers_list = []
         try:
-            for url in self.products_urls:
-                response = requests.get(
-                    url,
-                    headers={
-                        'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:79.0) Gecko/20100101 Firefox/79.0'
-                    },
+            self._load_page_snapshots()
+            with self._get_parse_executor() as executor:
+                parsing_stage = ParsingStage(
+                    executor, self.html_parser, self.parse_chunk_size
                 )
+                pages = []
+                for index, url in enumerate(self.products_urls):
+                    response = requests.get(
+                        url,
+                        headers={
+                            **scraper_headers,
+                            **self._get_request_headers(url),
+                        },
+                    )
+                    pages.append(
+                        (
+                            response.status_code,
+                            response.content,
+                            response.headers,
+                        )
+                    )
+                    if self._needs_parsing(
+                        url, response.status_code, response.content
+                    ):
+                        parsing_stage.submit(index, response.content)
+                parsed_sellers = parsing_stage.get_results()
 
-                soup = BeautifulSoup(response.content, 'html.parser')
-                id_sellers = soup.find_all(
-                    'a',
-                    class_='btn btn-block btn-primary btn-lg js-add-to-cart',
+            for index, (url, (status, content, headers)) in enumerate(
+                zip(self.products_urls, pages)
+            ):
+                sellers_list.extend(
+                    self._resolve_page(
+                        url,
+                        status,
+                        content,
+                        headers,
+                        sellers=parsed_sellers.get(index),
+                    )
                 )
+            self._save_page_snapshots()
+            return sellers_list
+
+        except requests.RequestException as e:
+            scraper_logger.exception(e)
 
-                for id_seller in id_sellers:
-                    sellers = id_seller.get('data-sku')
-                    row = json.loads(sellers)[0]
-                    '\n'
+    async def _fetch_page(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        rate_limiter: HostRateLimiter,
+        url: str,
+        headers: Dict[str, str] = None,
+    ) -> Tuple[int | None, bytes | None, Dict[str, str]]:
+        async with semaphore:
+            await rate_limiter.wait(urlparse(url).netloc)
+            try:
+                async with session.get(url, headers=headers) as response:
+                    return (
+                        response.status,
+                        await response.read(),
+                        response.headers,
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                scraper_logger.error(f'Failed to fetch {url}: {repr(e)}')
+                return None, None, {}
+
+    async def _fetch_indexed_page(
+        self,
+        session: aiohttp.ClientSession,
+        semaphore: asyncio.Semaphore,
+        rate_limiter: HostRateLimiter,
+        index: int,
+        url: str,
+    ) -> Tuple[int, Tuple[int | None, bytes | None, Dict[str, str]]]:
+        page = await self._fetch_page(
+            session,
+            semaphore,
+            rate_limiter,
+            url,
+            headers=self._get_request_headers(url),
+        )
+        return index, page
 
-                    scraper_logger.info(
-                        f"Extraindo dados do vendedor Id: {row['seller']['id']} \
-                            | Loja: {row['seller']['name']} "
+    async def scrap_products_from_beleza_na_web_async(self) -> List[List]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        rate_limiter = HostRateLimiter(self.requests_per_host)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        self._load_page_snapshots()
+        pages = [None] * len(self.products_urls)
+        with self._get_parse_executor() as executor:
+            # pages are handed to the parsing processes as soon as they
+            # arrive, so parsing overlaps with the remaining downloads
+            parsing_stage = ParsingStage(
+                executor, self.html_parser, self.parse_chunk_size
+            )
+            async with aiohttp.ClientSession(
+                connector=connector, timeout=timeout, headers=scraper_headers
+            ) as session:
+                fetch_tasks = [
+                    asyncio.create_task(
+                        self._fetch_indexed_page(
+                            session, semaphore, rate_limiter, index, url
+                        )
                     )
+                    for index, url in enumerate(self.products_urls)
+                ]
+                for fetched_page in asyncio.as_completed(fetch_tasks):
+                    index, page = await fetched_page
+                    pages[index] = page
+                    status, content, _ = page
+                    if self._needs_parsing(
+                        self.products_urls[index], status, content
+                    ):
+                        parsing_stage.submit(index, content)
+            parsed_sellers = await parsing_stage.get_results_async()
 
-                    sellers_row = [
-                        row['sku'],
-                        row['brand'],
-                        row['category'],
-                        row['name'],
-                        row['price'],
-                        row['seller']['name'],
-                    ]
-                    sellers_list.append(sellers_row)
-            return sellers_list
+        sellers_list = []
+        for index, (url, (status, content, headers)) in enumerate(
+            zip(self.products_urls, pages)
+        ):
+            sellers_list.extend(
+                self._resolve_page(
+                    url,
+                    status,
+                    content,
+                    headers,
+                    sellers=parsed_sellers.get(index),
+                )
+            )
+        self._save_page_snapshots()
+        return sellers_list
 
-        except requests.RequestException as e:
-            scraper_logger.exception(e)
+    @benchmark_with(scraper_logger)
+    @logging_with(scraper_logger)
+    def scrap_products_from_beleza_na_web_concurrently(self) -> List[List]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.scrap_products_from_beleza_na_web_async())
+
+        # called from a running event loop (e.g. a notebook), so the
+        # scraping loop gets a thread of its own
+        result = {}
+        thread = threading.Thread(
+            target=lambda: result.update(
+                sellers_list=asyncio.run(
+                    self.scrap_products_from_beleza_na_web_async()
+                )
+            )
+        )
+        thread.start()
+        thread.join()
+        return result.get('sellers_list', [])
 
     @benchmark_with(scraper_logger)
     @logging_with(scraper_logger)
@@ -76,7 +502,16 @@ class Scraper:
         sellers_list = []
         try:
             if self.marketplace == 'BELEZA_NA_WEB':
-                sellers_list = self.scrap_products_from_beleza_na_web()
+                if self.engine == 'async':
+                    sellers_list = (
+                        self.scrap_products_from_beleza_na_web_concurrently()
+                    )
+                elif self.engine == 'sync':
+                    sellers_list = self.scrap_products_from_beleza_na_web()
+                else:
+                    raise ValueError(
+                        f'Unsupported scraping engine: {self.engine}'
+                    )
         except requests.RequestException as e:
             scraper_logger.exception(e)
 
@@ -0,0 +1,64 @@
+import logging
+from typing import TYPE_CHECKING, Dict, List
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from kami_gsuite.kami_gsheet import KamiGsheet
+
+sheet_snapshot_logger = logging.getLogger('Sheet Snapshot')
+
+
+class SheetSnapshotError(Exception):
+    pass
+
+
+def convert_values_to_dataframe(values: List[List[str]]) -> pd.DataFrame:
+    # same layout as KamiGsheet.convert_range_to_dataframe: the first row
+    # holds the column names
+    if not values:
+        return pd.DataFrame()
+    return pd.DataFrame(values[1:], columns=values[0])
+
+
+class SheetSnapshot:
+    def __init__(self, gsheet: 'KamiGsheet', sheet_id: str, ranges: List[str]):
+        self.gsheet = gsheet
+        self.sheet_id = sheet_id
+        self.ranges = list(dict.fromkeys(ranges))
+        self.frames: Dict[str, pd.DataFrame] = {}
+
+    def load(self) -> 'SheetSnapshot':
+        try:
+            if self.gsheet.service is None:
+                self.gsheet.connect()
+            response = (
+                self.gsheet.service.spreadsheets()
+                .values()
+                .batchGet(spreadsheetId=self.sheet_id, ranges=self.ranges)
+                .execute()
+            )
+        except Exception as e:
+            raise SheetSnapshotError(
+                f'Failed to load ranges {self.ranges} from {self.sheet_id}: {str(e)}'
+            )
+
+        # value ranges come back in request order, with normalized names
+        value_ranges = response.get('valueRanges', [])
+        self.frames = {
+            sheet_range: convert_values_to_dataframe(
+                value_range.get('values', [])
+            )
+            for sheet_range, value_range in zip(self.ranges, value_ranges)
+        }
+        sheet_snapshot_logger.info(
+            f'Loaded {len(self.frames)} ranges from {self.sheet_id} in one request'
+        )
+        return self
+
+    def get_dataframe(self, sheet_range: str) -> pd.DataFrame:
+        if sheet_range not in self.frames:
+            raise SheetSnapshotError(
+                f'Range {sheet_range} is not part of this snapshot'
+            )
+        return self.frames[sheet_range].copy()
@@ -0,0 +1,50 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from os import makedirs, path
+from typing import Iterator, List, Sequence, Type
+
+# older sqlite builds cap the number of ? placeholders at 999
+MAX_QUERY_PARAMETERS = 500
+
+
+def chunk_parameters(
+    parameters: Sequence, size: int = MAX_QUERY_PARAMETERS
+) -> List[Sequence]:
+    return [
+        parameters[start : start + size]
+        for start in range(0, len(parameters), size)
+    ]
+
+
+class SQLiteStore:
+    schema: str = ''
+    error_class: Type[Exception] = sqlite3.Error
+    store_name: str = 'store'
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        try:
+            db_dir = path.dirname(self.db_path)
+            if db_dir:
+                makedirs(db_dir, exist_ok=True)
+            connection = sqlite3.connect(self.db_path)
+            connection.execute(self.schema)
+            return connection
+        except (OSError, sqlite3.Error) as e:
+            raise self.error_class(
+                f'Failed to open {self.store_name} at {self.db_path}: {str(e)}'
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    yield connection
+            finally:
+                connection.close()
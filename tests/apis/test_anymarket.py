@@ -1,13 +1,21 @@
 import json
+import tempfile
+import threading
+import time
 import unittest
+from os import path
 from unittest.mock import MagicMock, mock_open, patch
 
+import httpx
+import pandas as pd
+
 from kami_pricing.api.anymarket import AnymarketAPI, AnymarketAPIError
+from kami_pricing.api.cache import ResponseCache
 
 
 class TestAnymarketAPI(unittest.TestCase):
     def setUp(self):
-        self.api = AnymarketAPI()
+        self.api = AnymarketAPI(response_cache=ResponseCache())
         self.api.credentials_path = 'credentials.json'
 
     @patch('builtins.open', mock_open(read_data='{"token": "your_token"}'))
@@ -188,6 +196,39 @@ class TestAnymarketAPI(unittest.TestCase):
             self.api.update_price('ad_id', 99.99)
         self.assertIn('Failed to update price', str(context.exception))
 
+    @patch(
+        'httpx.Client.get',
+        return_value=MagicMock(status_code=200, json=lambda: {'id': '123'}),
+    )
+    def test_connect_reuses_client(self, mock_get):
+        self.api.credentials = {'token': 'mock-token'}
+
+        self.api._connect('GET', '/v2/products/123')
+        client = self.api.client
+        self.api._connect('GET', '/v2/products/456')
+
+        self.assertIs(self.api.client, client)
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_client_limits_and_timeout(self):
+        api = AnymarketAPI(max_connections=5, timeout=12.0)
+        client = api._get_client()
+
+        self.assertEqual(client.timeout.read, 12.0)
+        self.assertEqual(
+            client._transport._pool._max_connections,
+            5,
+        )
+        api.close()
+
+    def test_context_manager_closes_client(self):
+        with AnymarketAPI() as api:
+            client = api._get_client()
+            self.assertFalse(client.is_closed)
+
+        self.assertTrue(client.is_closed)
+        self.assertIsNone(api.client)
+
     def test_update_price_rejects_improper_decimal_places(self):
         with self.assertRaises(AnymarketAPIError) as context:
             self.api.update_price('ad_id', 99.999)
@@ -196,6 +237,568 @@ class TestAnymarketAPI(unittest.TestCase):
             str(context.exception),
         )
 
+    @patch(
+        'httpx.Client.put',
+        return_value=MagicMock(status_code=200, json=lambda: []),
+    )
+    def test_update_prices_in_batches_chunks_requests(self, mock_put):
+        self.api.credentials = {'token': 'mock-token'}
+        ads_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3', 'K4', 'K5'],
+                'id': [1, 2, 3, 4, 5],
+                'special_price': [10.0, 20.5, 30.99, 40.1, 50.0],
+            }
+        )
+
+        results_df = self.api.update_prices_in_batches(ads_df, batch_size=2)
+
+        self.assertEqual(mock_put.call_count, 3)
+        self.assertIn(
+            [
+                {'id': 1, 'price': 10.0, 'discountPrice': 10.0},
+                {'id': 2, 'price': 20.5, 'discountPrice': 20.5},
+            ],
+            [call.kwargs['json'] for call in mock_put.call_args_list],
+        )
+        self.assertTrue(results_df['success'].all())
+
+    @patch('httpx.Client.put')
+    def test_update_prices_in_batches_maps_failures_to_skus(self, mock_put):
+        self.api.credentials = {'token': 'mock-token'}
+
+        def put(url, json, headers):
+            if json[0]['id'] == 3:
+                raise Exception('Connection reset')
+            return MagicMock(
+                status_code=200,
+                json=lambda: [{'id': 2, 'errorMessage': 'Ad is paused'}],
+            )
+
+        mock_put.side_effect = put
+        ads_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3'],
+                'id': [1, 2, 3],
+                'special_price': [10.0, 20.5, 30.99],
+            }
+        )
+
+        results_df = self.api.update_prices_in_batches(ads_df, batch_size=2)
+
+        failed = results_df.set_index('sku (*)')
+        self.assertEqual(list(results_df['success']), [True, False, False])
+        self.assertEqual(failed.loc['K2', 'error'], 'Ad is paused')
+        self.assertIn('Connection reset', failed.loc['K3', 'error'])
+
+    @patch(
+        'httpx.Client.put',
+        return_value=MagicMock(status_code=200, json=lambda: []),
+    )
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._get_marketplace_ad')
+    def test_update_prices_on_marketplace_in_batches(
+        self, mock_get_marketplace_ad, mock_put
+    ):
+        self.api.credentials = {'token': 'mock-token'}
+
+        def get_marketplace_ad(partner_id, marketplace):
+            if partner_id == 'K2':
+                raise AnymarketAPIError(
+                    'Sku K2 has no advertisement on BELEZA_NA_WEB'
+                )
+            return {'id': int(partner_id[1:]), 'marketPlace': marketplace}
+
+        mock_get_marketplace_ad.side_effect = get_marketplace_ad
+        pricing_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3'],
+                'special_price': [10.001, 20.5, 30.0],
+            }
+        )
+
+        results_df = self.api.update_prices_on_marketplace(
+            pricing_df, batch_size=50, use_catalog_index=False
+        )
+
+        mock_put.assert_called_once()
+        self.assertEqual(
+            mock_put.call_args.kwargs['json'],
+            [
+                {'id': 1, 'price': 10.0, 'discountPrice': 10.0},
+                {'id': 3, 'price': 30.0, 'discountPrice': 30.0},
+            ],
+        )
+        self.assertEqual(list(results_df['sku (*)']), ['K1', 'K2', 'K3'])
+        self.assertEqual(list(results_df['success']), [True, False, True])
+        self.assertIn('no advertisement', results_df.loc[1, 'error'])
+        self.assertTrue((results_df['latency'] >= 0).all())
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI.update_price')
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._get_marketplace_ad')
+    def test_update_prices_on_marketplace_runs_skus_concurrently(
+        self, mock_get_marketplace_ad, mock_update_price
+    ):
+        barrier = threading.Barrier(4, timeout=5)
+
+        def get_marketplace_ad(partner_id, marketplace):
+            barrier.wait()
+            return {'id': partner_id, 'marketPlace': marketplace}
+
+        mock_get_marketplace_ad.side_effect = get_marketplace_ad
+        pricing_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3', 'K4'],
+                'special_price': [10.0, 20.0, 30.0, 40.0],
+            }
+        )
+        self.api.max_workers = 4
+
+        results_df = self.api.update_prices_on_marketplace(
+            pricing_df, batch_size=0, use_catalog_index=False
+        )
+
+        self.assertEqual(mock_update_price.call_count, 4)
+        self.assertEqual(list(results_df['ad_id']), ['K1', 'K2', 'K3', 'K4'])
+        self.assertTrue(results_df['success'].all())
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._connect')
+    def test_iter_pages(self, mock_connect):
+        mock_connect.side_effect = [
+            {'content': [{'id': 1}, {'id': 2}], 'page': {'totalElements': 3}},
+            {'content': [{'id': 3}], 'page': {'totalElements': 3}},
+        ]
+
+        items = list(self.api._iter_pages('/v2/products', page_size=2))
+
+        self.assertEqual([item['id'] for item in items], [1, 2, 3])
+        self.assertEqual(
+            mock_connect.call_args_list[1].kwargs['endpoint'],
+            '/v2/products?offset=2&limit=2',
+        )
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._connect')
+    def test_iter_pages_prefetches_next_pages(self, mock_connect):
+        def connect(endpoint):
+            offset = int(endpoint.split('offset=')[1].split('&')[0])
+            content = [{'id': id} for id in range(offset, min(offset + 2, 7))]
+            return {'content': content, 'page': {'totalElements': 7}}
+
+        mock_connect.side_effect = connect
+
+        items = list(
+            self.api._iter_pages('/v2/products', page_size=2, prefetch=3)
+        )
+
+        self.assertEqual([item['id'] for item in items], list(range(7)))
+        self.assertEqual(mock_connect.call_count, 4)
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._connect')
+    def test_iter_pages_stops_when_offset_is_ignored(self, mock_connect):
+        mock_connect.return_value = [{'id': 1}, {'id': 2}]
+
+        items = list(self.api._iter_pages('/v2/skus', page_size=2))
+
+        self.assertEqual([item['id'] for item in items], [1, 2])
+        self.assertEqual(mock_connect.call_count, 2)
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._connect')
+    def test_iter_pages_raises_after_max_pages(self, mock_connect):
+        def connect(endpoint):
+            offset = int(endpoint.split('offset=')[1].split('&')[0])
+            return [{'id': offset}, {'id': offset + 1}]
+
+        mock_connect.side_effect = connect
+        self.api.max_pages = 5
+
+        for prefetch in (0, 2):
+            with self.subTest(prefetch=prefetch):
+                mock_connect.reset_mock()
+                with self.assertRaises(AnymarketAPIError):
+                    list(
+                        self.api._iter_pages(
+                            '/v2/skus', page_size=2, prefetch=prefetch
+                        )
+                    )
+                self.assertLessEqual(mock_connect.call_count, 8)
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._connect')
+    def test_get_partner_and_product_ids_streams_pages(self, mock_connect):
+        mock_connect.side_effect = [
+            {
+                'content': [
+                    {'id': 10, 'skus': [{'partnerId': 'K1'}]},
+                    {'id': 20, 'skus': [{'partnerId': 'K2'}, {}]},
+                ],
+                'page': {'totalElements': 3},
+            },
+            {
+                'content': [{'id': 30, 'skus': [{'partnerId': 'K3'}]}],
+                'page': {'totalElements': 3},
+            },
+        ]
+        self.api.page_size = 2
+
+        partner_ids, product_ids = self.api.get_partner_and_product_ids()
+
+        self.assertEqual(partner_ids, ['K1', 'K2', '', 'K3'])
+        self.assertEqual(product_ids, [10, 20, 30])
+        self.assertEqual(
+            mock_connect.call_args_list[0].kwargs['endpoint'],
+            '/v2/products?offset=0&limit=2',
+        )
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._iter_pages')
+    def test_catalog_snapshot_is_reused_between_projections(
+        self, mock_iter_pages
+    ):
+        mock_iter_pages.side_effect = lambda **kwargs: iter(
+            [{'id': 10, 'skus': [{'id': 100, 'partnerId': 'K1'}]}]
+        )
+
+        self.assertEqual(self.api.get_all_products_ids(), [10])
+        self.assertEqual(self.api.get_all_products_partner_ids(), ['K1'])
+        self.assertEqual(
+            self.api.get_partner_and_product_ids(), (['K1'], [10])
+        )
+        self.assertEqual(mock_iter_pages.call_count, 1)
+
+        self.api.catalog_snapshot.fetched_at -= (
+            self.api.catalog_reuse_window + 1
+        )
+        self.api.get_all_products_ids()
+        self.assertEqual(mock_iter_pages.call_count, 2)
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._iter_pages')
+    def test_build_catalog_index(self, mock_iter_pages):
+        mock_iter_pages.side_effect = [
+            iter([{'id': 10, 'skus': [{'id': 100, 'partnerId': 'K1'}]}]),
+            iter([{'id': 1000, 'idSku': 100, 'marketPlace': 'BELEZA_NA_WEB'}]),
+        ]
+
+        index = self.api.build_catalog_index(marketplace='BELEZA_NA_WEB')
+        self.api.build_catalog_index(marketplace='BELEZA_NA_WEB')
+
+        self.assertEqual(mock_iter_pages.call_count, 2)
+        self.assertEqual(
+            mock_iter_pages.call_args_list[1].kwargs['endpoint'],
+            '/v2/skus/marketplaces?marketplace=BELEZA_NA_WEB',
+        )
+        self.assertEqual(index.get_ad_id('K1', 'BELEZA_NA_WEB'), 1000)
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI.get_ads_by_partner_id')
+    @patch('kami_pricing.api.anymarket.AnymarketAPI.get_product_by_partner_id')
+    def test_get_marketplace_ad_uses_catalog_index(
+        self,
+        mock_get_product_by_partner_id,
+        mock_get_ads_by_partner_id,
+    ):
+        self.api.catalog_index.build(
+            products=[{'id': 10, 'skus': [{'id': 100, 'partnerId': 'K1'}]}],
+            ads=[{'id': 1000, 'idSku': 100, 'marketPlace': 'BELEZA_NA_WEB'}],
+        )
+
+        ad = self.api._get_marketplace_ad('K1', 'BELEZA_NA_WEB')
+
+        self.assertEqual(ad['id'], 1000)
+        self.assertEqual(ad['product_id'], 10)
+        mock_get_product_by_partner_id.assert_not_called()
+        mock_get_ads_by_partner_id.assert_not_called()
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI.get_ads_by_partner_id')
+    @patch('kami_pricing.api.anymarket.AnymarketAPI.get_product_by_partner_id')
+    def test_get_marketplace_ad_indexes_missing_skus(
+        self,
+        mock_get_product_by_partner_id,
+        mock_get_ads_by_partner_id,
+    ):
+        mock_get_product_by_partner_id.return_value = {'id': 20}
+        mock_get_ads_by_partner_id.return_value = [
+            {'id': 2000, 'marketPlace': 'AMAZON'},
+            {'id': 2001, 'marketPlace': 'BELEZA_NA_WEB'},
+        ]
+
+        ad = self.api._get_marketplace_ad('K2', 'BELEZA_NA_WEB')
+
+        self.assertEqual(ad['id'], 2001)
+        self.assertEqual(self.api.catalog_index.get_product_id('K2'), 20)
+        self.assertEqual(
+            self.api.catalog_index.get_ad_id('K2', 'BELEZA_NA_WEB'), 2001
+        )
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._switch_to_manual_pricing')
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._iter_pages')
+    def test_set_products_for_manual_pricing_skips_manual_products(
+        self, mock_iter_pages, mock_switch_to_manual_pricing
+    ):
+        mock_iter_pages.side_effect = [
+            iter(
+                [
+                    {
+                        'id': 10,
+                        'calculatedPrice': False,
+                        'definitionPriceScope': 'SKU_MARKETPLACE',
+                        'skus': [{'id': 100, 'partnerId': 'K1'}],
+                    },
+                    {
+                        'id': 20,
+                        'calculatedPrice': True,
+                        'skus': [{'id': 200, 'partnerId': 'K2'}],
+                    },
+                    {
+                        'id': 30,
+                        'calculatedPrice': False,
+                        'definitionPriceScope': 'SKU',
+                        'skus': [{'id': 300, 'partnerId': 'K3'}],
+                    },
+                ]
+            ),
+            iter([]),
+        ]
+
+        def switch_to_manual_pricing(product_id):
+            if product_id == 30:
+                raise AnymarketAPIError('Product locked')
+
+        mock_switch_to_manual_pricing.side_effect = switch_to_manual_pricing
+
+        result = self.api.set_products_for_manual_pricing([10, 20, 30, 20])
+        self.assertEqual(
+            result, {'switched': [20], 'skipped': [10], 'failed': [30]}
+        )
+
+        result = self.api.set_products_for_manual_pricing([10, 20, 30])
+        self.assertEqual(
+            result, {'switched': [], 'skipped': [10, 20], 'failed': [30]}
+        )
+        self.assertEqual(mock_iter_pages.call_count, 2)
+
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._switch_to_manual_pricing')
+    @patch('httpx.Client.get')
+    def test_set_products_for_manual_pricing_reads_fresh_index_from_disk(
+        self, mock_get, mock_switch_to_manual_pricing
+    ):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot_path = path.join(tmp_dir, 'catalog.json')
+            with open(snapshot_path, 'w') as f:
+                json.dump(
+                    {
+                        'built_at': time.time(),
+                        'product_ids': {'K1': 10, 'K2': 20},
+                        'ad_ids': {},
+                        'manual_pricing_product_ids': [10],
+                    },
+                    f,
+                )
+            api = AnymarketAPI(
+                response_cache=ResponseCache(),
+                catalog_snapshot_path=snapshot_path,
+            )
+
+            result = api.set_products_for_manual_pricing([10, 20])
+
+            self.assertEqual(
+                result, {'switched': [20], 'skipped': [10], 'failed': []}
+            )
+            mock_get.assert_not_called()
+            with open(snapshot_path, 'r') as f:
+                self.assertEqual(
+                    json.load(f)['manual_pricing_product_ids'], [10, 20]
+                )
+
+    @patch('httpx.Client.put')
+    @patch(
+        'kami_pricing.api.anymarket.AnymarketAPI.set_products_for_manual_pricing'
+    )
+    @patch('kami_pricing.api.anymarket.AnymarketAPI._get_marketplace_ad')
+    def test_update_prices_on_marketplace_switches_products_once(
+        self,
+        mock_get_marketplace_ad,
+        mock_set_products_for_manual_pricing,
+        mock_put,
+    ):
+        mock_put.return_value.json.return_value = []
+        mock_get_marketplace_ad.side_effect = lambda partner_id, marketplace: {
+            'id': partner_id,
+            'marketPlace': marketplace,
+            'product_id': 10,
+        }
+        pricing_df = pd.DataFrame(
+            {'sku (*)': ['K1', 'K2'], 'special_price': [10.0, 20.0]}
+        )
+
+        self.api.update_prices_on_marketplace(
+            pricing_df, use_catalog_index=False
+        )
+
+        mock_set_products_for_manual_pricing.assert_called_once_with(
+            product_ids=[10, 10], use_catalog=False
+        )
+
+    @patch('httpx.Client.get')
+    def test_get_products_ads_builds_typed_frame(self, mock_get):
+        ads = {
+            'K1': [
+                {
+                    'id': 1000,
+                    'skuInMarketplace': 'K1',
+                    'marketPlace': 'BELEZA_NA_WEB',
+                    'publicationStatus': 'ACTIVE',
+                    'marketplaceStatus': 'ACTIVE',
+                    'price': 10.5,
+                    'fields': {'title': 'Shampoo'},
+                },
+                {
+                    'id': 1001,
+                    'skuInMarketplace': 'K1',
+                    'marketPlace': 'AMAZON',
+                    'price': 11.0,
+                },
+            ],
+            'K2': [
+                {
+                    'id': 2000,
+                    'skuInMarketplace': 'K2',
+                    'marketPlace': 'AMAZON',
+                    'publicationStatus': 'PAUSED',
+                    'marketplaceStatus': 'PAUSED',
+                    'price': 20.0,
+                    'fields': {'title': 'Mask'},
+                }
+            ],
+        }
+
+        request = httpx.Request('GET', 'https://api.anymarket.com.br')
+
+        def get(url, **kwargs):
+            partner_id = url.split('=')[-1]
+            if partner_id == 'K3':
+                return httpx.Response(404, request=request)
+            return httpx.Response(200, json=ads[partner_id], request=request)
+
+        mock_get.side_effect = get
+        self.api.credentials = {'token': 'token'}
+
+        ads_df = self.api.get_products_ads(['K1', 'K2', 'K3'])
+
+        self.assertEqual(list(ads_df['id']), [1000, 2000])
+        self.assertEqual(ads_df['marketPlace'].dtype, 'category')
+        self.assertEqual(ads_df['publicationStatus'].dtype, 'category')
+        self.assertEqual(ads_df['price'].dtype, 'float64')
+
+        self.api.get_products_ads(['K1', 'K2'])
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('httpx.Client.get')
+    @patch('kami_pricing.api.anymarket.AnymarketAPI.get_product_by_partner_id')
+    def test_get_marketplace_ad_reuses_harvested_ads(
+        self, mock_get_product_by_partner_id, mock_get
+    ):
+        mock_get_product_by_partner_id.return_value = {'id': 10}
+        mock_get.return_value = MagicMock(
+            status_code=200,
+            json=lambda: [
+                {
+                    'id': 1000,
+                    'skuInMarketplace': 'K1',
+                    'marketPlace': 'AMAZON',
+                },
+                {
+                    'id': 1001,
+                    'skuInMarketplace': 'K1',
+                    'marketPlace': 'BELEZA_NA_WEB',
+                },
+            ],
+        )
+        self.api.credentials = {'token': 'token'}
+        self.api.get_products_ads(['K1'])
+
+        ad = self.api._get_marketplace_ad('K1', 'BELEZA_NA_WEB')
+
+        self.assertEqual(ad['id'], 1001)
+        self.assertIsInstance(ad['id'], int)
+        mock_get.assert_called_once()
+
+    @patch('kami_pricing.api.retry.time.sleep')
+    @patch('httpx.Client.get')
+    def test_connect_retries_transient_errors(self, mock_get, mock_sleep):
+        request = httpx.Request('GET', 'https://api.anymarket.com.br')
+        mock_get.side_effect = [
+            httpx.Response(503, request=request),
+            httpx.Response(200, json={'id': 1}, request=request),
+        ]
+        self.api.credentials = {'token': 'token'}
+
+        result = self.api._connect(endpoint='/v2/products/1')
+
+        self.assertEqual(result, {'id': 1})
+        self.assertEqual(
+            self.api.retry_policy.get_retry_counts(),
+            {'GET /v2/products/{id}': 1},
+        )
+
+    @patch('httpx.Client.put')
+    @patch('httpx.Client.get')
+    def test_read_only_lookups_are_cached_until_a_write(
+        self, mock_get, mock_put
+    ):
+        self.api.credentials = {'token': 'mock-token'}
+        mock_get.return_value = MagicMock(
+            status_code=200, json=lambda: [{'id': 1000}]
+        )
+        mock_put.return_value = MagicMock(status_code=200, json=lambda: [])
+
+        self.api.get_ads_by_partner_id('K1')
+        self.api.get_ads_by_partner_id('K1')
+        self.assertEqual(mock_get.call_count, 1)
+
+        self.api.update_price(ad_id=1000, new_price=10.0)
+        self.api.get_ads_by_partner_id('K1')
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(self.api.response_cache.get_metrics()['hits'], 1)
+
+    @patch('httpx.Client.get')
+    def test_response_cache_is_scoped_to_the_account(self, mock_get):
+        mock_get.return_value = MagicMock(
+            status_code=200, json=lambda: {'content': [{'id': 'PROD-1'}]}
+        )
+        self.api.credentials = {'token': 'token'}
+        sandbox_api = AnymarketAPI(
+            base_url='https://sandbox-api.anymarket.com.br',
+            response_cache=self.api.response_cache,
+        )
+        sandbox_api.credentials = {'token': 'token'}
+        other_account_api = AnymarketAPI(
+            response_cache=self.api.response_cache
+        )
+        other_account_api.credentials = {'token': 'other-token'}
+
+        self.api.get_product_by_partner_id('K001')
+        self.api.get_product_by_partner_id('K001')
+        sandbox_api.get_product_by_partner_id('K001')
+        other_account_api.get_product_by_partner_id('K001')
+
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('httpx.Client.put')
+    @patch('httpx.Client.get')
+    def test_price_update_keeps_other_partners_ads_cached(
+        self, mock_get, mock_put
+    ):
+        self.api.credentials = {'token': 'mock-token'}
+        ads = {'K1': [{'id': 1000}], 'K2': [{'id': 2000}]}
+        mock_get.side_effect = lambda url, **kwargs: MagicMock(
+            status_code=200, json=lambda: ads[url.split('=')[-1]]
+        )
+        mock_put.return_value = MagicMock(status_code=200, json=lambda: [])
+
+        self.api.get_ads_by_partner_id('K1')
+        self.api.get_ads_by_partner_id('K2')
+        self.api.update_price(ad_id=1000, new_price=10.0)
+        self.api.get_ads_by_partner_id('K1')
+        self.api.get_ads_by_partner_id('K2')
+
+        self.assertEqual(mock_get.call_count, 3)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,123 @@
+import json
+import tempfile
+import time
+import unittest
+from os import path
+
+from kami_pricing.api.anymarket_catalog import (
+    AnymarketCatalogIndex,
+    AnymarketCatalogSnapshot,
+)
+
+PRODUCTS = [
+    {
+        'id': 10,
+        'calculatedPrice': False,
+        'definitionPriceScope': 'SKU_MARKETPLACE',
+        'skus': [{'id': 100, 'partnerId': 'K1'}],
+    },
+    {
+        'id': 20,
+        'skus': [
+            {'id': 200, 'partnerId': 'K2'},
+            {'id': 201, 'partnerId': 'K3'},
+        ],
+    },
+]
+ADS = [
+    {'id': 1000, 'idSku': 100, 'marketPlace': 'BELEZA_NA_WEB'},
+    {'id': 1001, 'idSku': 100, 'marketPlace': 'BELEZA_NA_WEB'},
+    {'id': 2000, 'idSku': 200, 'marketPlace': 'AMAZON'},
+    {'id': 2010, 'skuInMarketplace': 'K3', 'marketPlace': 'BELEZA_NA_WEB'},
+]
+
+
+class TestAnymarketCatalogIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = AnymarketCatalogIndex()
+        self.index.build(products=PRODUCTS, ads=ADS)
+
+    def test_build_indexes_products_by_partner_id(self):
+        self.assertEqual(len(self.index), 3)
+        self.assertEqual(self.index.get_product_id('K1'), 10)
+        self.assertEqual(self.index.get_product_id('K3'), 20)
+        self.assertIsNone(self.index.get_product_id('K4'))
+
+    def test_build_keeps_first_ad_of_each_marketplace(self):
+        self.assertEqual(self.index.get_ad_id('K1', 'BELEZA_NA_WEB'), 1000)
+        self.assertEqual(self.index.get_ad_id('K2', 'AMAZON'), 2000)
+        self.assertEqual(self.index.get_ad_id('K3', 'BELEZA_NA_WEB'), 2010)
+        self.assertIsNone(self.index.get_ad_id('K2', 'BELEZA_NA_WEB'))
+
+    def test_is_expired(self):
+        self.assertFalse(self.index.is_expired())
+        self.index.built_at = time.time() - self.index.ttl - 1
+        self.assertTrue(self.index.is_expired())
+        self.assertTrue(AnymarketCatalogIndex().is_expired())
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot_path = path.join(tmp_dir, 'data', 'catalog.json')
+            self.index.snapshot_path = snapshot_path
+            self.index.save()
+
+            loaded = AnymarketCatalogIndex(snapshot_path=snapshot_path)
+
+            self.assertTrue(loaded.load())
+            self.assertEqual(loaded.get_product_id('K2'), 20)
+            self.assertEqual(loaded.get_ad_id('K1', 'BELEZA_NA_WEB'), 1000)
+            self.assertEqual(loaded.manual_pricing_product_ids, {10})
+
+    def test_load_ignores_expired_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot_path = path.join(tmp_dir, 'catalog.json')
+            with open(snapshot_path, 'w') as f:
+                json.dump(
+                    {'built_at': time.time() - 7200, 'product_ids': {'K1': 1}},
+                    f,
+                )
+
+            index = AnymarketCatalogIndex(
+                ttl=3600, snapshot_path=snapshot_path
+            )
+
+            self.assertFalse(index.load())
+            self.assertEqual(len(index), 0)
+
+
+class TestAnymarketCatalogSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.snapshot = AnymarketCatalogSnapshot(products=iter(PRODUCTS))
+
+    def test_projections(self):
+        self.assertEqual(self.snapshot.product_ids, [10, 20])
+        self.assertEqual(self.snapshot.partner_ids, ['K1', 'K2', 'K3'])
+        self.assertEqual(
+            self.snapshot.partner_product_ids, {'K1': 10, 'K2': 20, 'K3': 20}
+        )
+        self.assertEqual(
+            self.snapshot.sku_partner_ids, {100: 'K1', 200: 'K2', 201: 'K3'}
+        )
+
+    def test_dataframe_has_one_row_per_sku(self):
+        catalog_df = self.snapshot.dataframe
+
+        self.assertEqual(list(catalog_df['partner_id']), ['K1', 'K2', 'K3'])
+        self.assertEqual(list(catalog_df['product_id']), [10, 20, 20])
+
+    def test_is_expired(self):
+        self.assertFalse(self.snapshot.is_expired())
+        self.snapshot.fetched_at = time.time() - self.snapshot.ttl - 1
+        self.assertTrue(self.snapshot.is_expired())
+
+    def test_index_built_from_snapshot(self):
+        index = AnymarketCatalogIndex()
+        index.build_from_snapshot(self.snapshot, ads=ADS)
+
+        self.assertEqual(index.get_product_id('K3'), 20)
+        self.assertEqual(index.get_ad_id('K2', 'AMAZON'), 2000)
+        self.assertEqual(index.manual_pricing_product_ids, {10})
+
+
+if __name__ == '__main__':
+    unittest.main()
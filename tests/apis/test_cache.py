@@ -0,0 +1,124 @@
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from kami_pricing.api.cache import (
+    ResponseCache,
+    get_cache_tags,
+    get_resource_ids,
+    get_resource_prefix,
+)
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_get_returns_cached_value_and_counts_metrics(self):
+        cache = ResponseCache()
+        cache.set('/v2/products/1', {'id': 1})
+
+        self.assertEqual(cache.get('/v2/products/1'), {'id': 1})
+        self.assertIsNone(cache.get('/v2/products/2'))
+        self.assertEqual(
+            cache.get_metrics(),
+            {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'size': 1},
+        )
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_expired_entries_are_misses(self):
+        cache = ResponseCache(ttl=10)
+        cache.set('a', 1)
+
+        with patch(
+            'kami_pricing.api.cache.time.time', return_value=time.time() + 11
+        ):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_invalidate_drops_keys_under_prefix(self):
+        cache = ResponseCache()
+        cache.set('/v2/skus/marketplaces?partnerID=K1', [])
+        cache.set('/v2/products?partnerId=K1', {})
+
+        cache.invalidate(
+            get_resource_prefix('/v2/skus/marketplaces/prices', 2)
+        )
+
+        self.assertIsNone(cache.get('/v2/skus/marketplaces?partnerID=K1'))
+        self.assertEqual(cache.get('/v2/products?partnerId=K1'), {})
+
+    def test_invalidate_tags_drops_only_written_resources(self):
+        cache = ResponseCache()
+        cache.set(
+            '/v2/skus/marketplaces?partnerID=K1',
+            [{'id': 'A1'}],
+            tags=get_cache_tags('/v2/skus/marketplaces', ['A1'], 2),
+        )
+        cache.set(
+            '/v2/skus/marketplaces?partnerID=K2',
+            [{'id': 'A2'}],
+            tags=get_cache_tags('/v2/skus/marketplaces', ['A2'], 2),
+        )
+
+        cache.invalidate_tags(
+            get_cache_tags('/v2/skus/marketplaces/prices', ['A1'], 2)
+        )
+
+        self.assertIsNone(cache.get('/v2/skus/marketplaces?partnerID=K1'))
+        self.assertEqual(
+            cache.get('/v2/skus/marketplaces?partnerID=K2'), [{'id': 'A2'}]
+        )
+
+    def test_disk_backend_keeps_tags(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ResponseCache(cache_dir=tmp_dir).set(
+                '/v2/products/1', {'id': 1}, tags=['/v2/products:1']
+            )
+            ResponseCache(cache_dir=tmp_dir).set(
+                '/v2/products/2', {'id': 2}, tags=['/v2/products:2']
+            )
+
+            ResponseCache(cache_dir=tmp_dir).invalidate_tags(
+                ['/v2/products:1']
+            )
+
+            cache = ResponseCache(cache_dir=tmp_dir)
+            self.assertIsNone(cache.get('/v2/products/1'))
+            self.assertEqual(cache.get('/v2/products/2'), {'id': 2})
+
+    def test_disk_backend_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ResponseCache(cache_dir=tmp_dir).set('a', {'id': 1})
+
+            cache = ResponseCache(cache_dir=tmp_dir)
+            self.assertEqual(cache.get('a'), {'id': 1})
+
+            ResponseCache(cache_dir=tmp_dir).invalidate('a')
+            self.assertIsNone(ResponseCache(cache_dir=tmp_dir).get('a'))
+
+    def test_get_resource_prefix(self):
+        self.assertEqual(
+            get_resource_prefix('/v2/products/10?fields=id', 2), '/v2/products'
+        )
+        self.assertEqual(get_resource_prefix('/skus/K1'), '/skus')
+
+    def test_get_resource_ids(self):
+        self.assertEqual(get_resource_ids({'id': 1}), ['1'])
+        self.assertEqual(
+            get_resource_ids({'content': [{'id': 1}, {'id': 2}]}), ['1', '2']
+        )
+        self.assertEqual(get_resource_ids([{'id': 'A1'}, {}]), ['A1'])
+        self.assertEqual(get_resource_ids(None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
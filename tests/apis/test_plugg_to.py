@@ -1,9 +1,23 @@
 import json
+import threading
 import unittest
-from unittest.mock import mock_open, patch
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, mock_open, patch
 
 # Using the provided names for module and class
+import httpx
+import pandas as pd
+
 from kami_pricing.api.plugg_to import PluggToAPI, PluggToAPIError
+from kami_pricing.api.retry import RetryPolicy
+from kami_pricing.api.token_cache import TokenCache
+
+credentials = {
+    'client_id': 'client',
+    'client_secret': 'secret',
+    'username': 'user',
+    'password': 'pass',
+}
 
 
 class TestPluggToAPI(unittest.TestCase):
@@ -61,6 +75,204 @@ class TestPluggToAPI(unittest.TestCase):
             'Failed to get credentials: Generic error', str(context.exception)
         )
 
+    # Token Cache Tests
+    @patch(
+        'kami_pricing.api.plugg_to.PluggToAPI._request_access_token',
+        return_value=('token-1', 3600),
+    )
+    def test_access_token_is_shared_between_instances(
+        self, mock_request_access_token
+    ):
+        token_cache = TokenCache()
+        for _ in range(2):
+            api = PluggToAPI(token_cache=token_cache)
+            api.credentials = credentials
+            api._set_access_token()
+            self.assertEqual(api.access_token, 'token-1')
+
+        mock_request_access_token.assert_called_once()
+
+    @patch('httpx.Client.put')
+    @patch('kami_pricing.api.plugg_to.PluggToAPI._request_access_token')
+    def test_connect_retries_once_on_unauthorized(
+        self, mock_request_access_token, mock_put
+    ):
+        mock_request_access_token.side_effect = [
+            ('expired-token', 3600),
+            ('new-token', 3600),
+        ]
+        mock_put.side_effect = [
+            MagicMock(status_code=401),
+            MagicMock(status_code=200, json=lambda: {'id': 'sku'}),
+        ]
+        self.api_instance.token_cache = TokenCache()
+        self.api_instance.credentials = credentials
+
+        result = self.api_instance._connect(
+            method='PUT', endpoint='/skus/K1', payload='[]'
+        )
+
+        self.assertEqual(result, {'id': 'sku'})
+        self.assertEqual(
+            mock_put.call_args.kwargs['headers']['Authorization'],
+            'Bearer new-token',
+        )
+
+    @patch('httpx.Client.put')
+    @patch('kami_pricing.api.plugg_to.PluggToAPI._request_access_token')
+    def test_concurrent_unauthorized_requests_refresh_token_once(
+        self, mock_request_access_token, mock_put
+    ):
+        threads_count = 6
+        barrier = threading.Barrier(threads_count)
+        mock_request_access_token.side_effect = [
+            ('expired-token', 3600),
+            ('new-token', 3600),
+            ('newer-token', 3600),
+        ]
+
+        def put(url, content, headers):
+            if headers['Authorization'] == 'Bearer expired-token':
+                # every thread is rejected before any of them refreshes
+                barrier.wait(timeout=5)
+                return MagicMock(status_code=401)
+            return MagicMock(status_code=200, json=lambda: {'id': 'sku'})
+
+        mock_put.side_effect = put
+        self.api_instance.token_cache = TokenCache()
+        self.api_instance.credentials = credentials
+        self.api_instance._set_access_token()
+
+        with ThreadPoolExecutor(max_workers=threads_count) as executor:
+            results = list(
+                executor.map(
+                    lambda i: self.api_instance._connect(
+                        method='PUT', endpoint=f'/skus/K{i}', payload='[]'
+                    ),
+                    range(threads_count),
+                )
+            )
+
+        self.assertEqual(results, [{'id': 'sku'}] * threads_count)
+        # the initial token plus exactly one refresh
+        self.assertEqual(mock_request_access_token.call_count, 2)
+        self.assertEqual(self.api_instance.access_token, 'new-token')
+
+    # Bulk Update Tests
+    def test_client_is_reused_between_requests(self):
+        with PluggToAPI() as api:
+            self.assertIs(api._get_client(), api._get_client())
+        self.assertIsNone(api.client)
+
+    @patch('kami_pricing.api.plugg_to.PluggToAPI.update_price')
+    def test_update_prices_returns_outcome_per_sku(self, mock_update_price):
+        def update_price(sku, new_price):
+            if sku == 'K2':
+                raise PluggToAPIError('Sku not found')
+
+        mock_update_price.side_effect = update_price
+        pricing_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3'],
+                'special_price': [10.0, 20.0, 30.0],
+            }
+        )
+
+        result = PluggToAPI(requests_per_second=None).update_prices(
+            pricing_df, max_retries=0
+        )
+
+        self.assertEqual(list(result['sku (*)']), ['K1', 'K2', 'K3'])
+        self.assertEqual(list(result['success']), [True, False, True])
+        self.assertIn('Sku not found', result.loc[1, 'error'])
+
+    @patch('kami_pricing.api.plugg_to.PluggToAPI.update_price')
+    def test_update_prices_retries_only_transient_failures(
+        self, mock_update_price
+    ):
+        failures = {'K2': 1, 'K3': 1}
+
+        def update_price(sku, new_price):
+            if failures.get(sku):
+                failures[sku] -= 1
+                if sku == 'K2':
+                    raise PluggToAPIError('Service unavailable', 503)
+                raise PluggToAPIError('Sku not found', 404)
+
+        mock_update_price.side_effect = update_price
+        pricing_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3'],
+                'special_price': [10.0, 20.0, 30.0],
+            }
+        )
+
+        result = PluggToAPI(
+            requests_per_second=None,
+            retry_policy=RetryPolicy(max_attempts=1),
+        ).update_prices(pricing_df, max_retries=1)
+
+        self.assertEqual(list(result['success']), [True, True, False])
+        self.assertEqual(list(result['attempts']), [1, 2, 1])
+        self.assertEqual(mock_update_price.call_count, 4)
+
+    @patch('kami_pricing.api.plugg_to.PluggToAPI.update_price')
+    def test_update_prices_retries_exhausted_rows_in_a_later_pass(
+        self, mock_update_price
+    ):
+        failures = {
+            'K1': PluggToAPIError('Service unavailable', 503),
+            'K2': PluggToAPIError('Too many requests', 429),
+            'K3': PluggToAPIError('Connection reset', network_error=True),
+        }
+
+        def update_price(sku, new_price):
+            error = failures.pop(sku, None)
+            if error:
+                raise error
+
+        mock_update_price.side_effect = update_price
+        pricing_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3'],
+                'special_price': [10.0, 20.0, 30.0],
+            }
+        )
+
+        result = PluggToAPI(requests_per_second=None).update_prices(pricing_df)
+
+        self.assertTrue(result['success'].all())
+        self.assertEqual(list(result['attempts']), [2, 2, 2])
+
+    @patch('httpx.Client.put')
+    def test_update_price_error_keeps_status_code(self, mock_put):
+        request = httpx.Request('PUT', 'https://api.plugg.to/skus/K1')
+        mock_put.return_value = httpx.Response(404, request=request)
+        self.api_instance.credentials = credentials
+
+        with patch.object(
+            self.api_instance, '_set_access_token', return_value='token'
+        ):
+            with self.assertRaises(PluggToAPIError) as context:
+                self.api_instance.update_price('K1', 10.0)
+
+        self.assertEqual(context.exception.status_code, 404)
+        self.assertFalse(context.exception.network_error)
+
+    @patch('kami_pricing.api.plugg_to.PluggToAPI.update_price')
+    def test_update_prices_runs_concurrently(self, mock_update_price):
+        barrier = threading.Barrier(4, timeout=5)
+        mock_update_price.side_effect = lambda sku, new_price: barrier.wait()
+        pricing_df = pd.DataFrame(
+            {'sku (*)': ['K1', 'K2', 'K3', 'K4'], 'special_price': [1.0] * 4}
+        )
+
+        result = PluggToAPI(
+            max_workers=4, requests_per_second=None
+        ).update_prices(pricing_df, max_retries=0)
+
+        self.assertTrue(result['success'].all())
+
 
 if __name__ == '__main__':
     unittest.main()
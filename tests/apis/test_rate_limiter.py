@@ -0,0 +1,139 @@
+import time
+import unittest
+
+from kami_pricing.api.anymarket import AnymarketAPI
+from kami_pricing.api.rate_limiter import (
+    AdaptiveTokenBucket,
+    HostRateLimiters,
+    SlidingWindowLimiter,
+    TokenBucket,
+)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_is_available_immediately(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+
+        self.assertTrue(all(bucket.try_acquire() for _ in range(3)))
+        self.assertFalse(bucket.try_acquire())
+
+    def test_acquire_waits_for_refill(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        bucket.acquire()
+
+        start = time.monotonic()
+        bucket.acquire()
+        bucket.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+
+    def test_rejects_non_positive_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestAdaptiveTokenBucket(unittest.TestCase):
+    def test_rate_drops_on_throttling_down_to_min_rate(self):
+        bucket = AdaptiveTokenBucket(rate=8, min_rate=2)
+
+        bucket.observe(429)
+        self.assertEqual(bucket.rate, 4)
+        bucket.observe(429)
+        bucket.observe(429)
+        self.assertEqual(bucket.rate, 2)
+
+    def test_rate_recovers_on_success_up_to_max_rate(self):
+        bucket = AdaptiveTokenBucket(rate=10, increase_step=2)
+        bucket.on_throttled()
+
+        bucket.observe(200)
+        self.assertEqual(bucket.rate, 7)
+        for _ in range(5):
+            bucket.observe(200)
+        self.assertEqual(bucket.rate, 10)
+
+    def test_client_errors_do_not_change_rate(self):
+        bucket = AdaptiveTokenBucket(rate=10)
+        bucket.on_throttled()
+
+        bucket.observe(404)
+
+        self.assertEqual(bucket.rate, 5)
+
+
+class TestHostRateLimiters(unittest.TestCase):
+    def test_limiter_is_shared_per_host(self):
+        rate_limiters = HostRateLimiters()
+
+        limiter = rate_limiters.get('api.plugg.to', requests_per_second=5)
+
+        self.assertIs(
+            limiter, rate_limiters.get('api.plugg.to', requests_per_second=5)
+        )
+        self.assertIsNot(
+            limiter,
+            rate_limiters.get('api.tiny.com.br', requests_per_second=1),
+        )
+
+    def test_configured_limits_override_client_defaults(self):
+        rate_limiters = HostRateLimiters(
+            {'api.plugg.to': {'requests_per_second': 2, 'burst': 4}}
+        )
+
+        limiter = rate_limiters.get('api.plugg.to', requests_per_second=5)
+
+        self.assertEqual(limiter.rate, 2)
+        self.assertEqual(limiter.capacity, 4)
+
+    def test_unconfigured_host_without_rate_is_not_limited(self):
+        self.assertIsNone(HostRateLimiters().get('api.tiny.com.br'))
+
+    def test_configure_replaces_existing_limiter(self):
+        rate_limiters = HostRateLimiters()
+        limiter = rate_limiters.get('api.plugg.to', requests_per_second=5)
+
+        rate_limiters.configure({'api.plugg.to': {'requests_per_second': 1}})
+
+        self.assertIsNot(limiter, rate_limiters.get('api.plugg.to'))
+        self.assertEqual(rate_limiters.get('api.plugg.to').rate, 1)
+
+    def test_configure_keeps_limiter_when_limits_are_unchanged(self):
+        rate_limiters = HostRateLimiters()
+        limits = {'api.plugg.to': {'requests_per_second': 5, 'burst': 10}}
+        rate_limiters.configure(limits)
+        limiter = rate_limiters.get('api.plugg.to')
+        limiter.on_throttled()
+
+        rate_limiters.configure(limits)
+
+        self.assertIs(rate_limiters.get('api.plugg.to'), limiter)
+        self.assertEqual(limiter.rate, 2.5)
+
+    def test_clients_of_the_same_host_share_the_limiter(self):
+        rate_limiters = HostRateLimiters()
+
+        first_api = AnymarketAPI(rate_limiters=rate_limiters)
+        second_api = AnymarketAPI(rate_limiters=rate_limiters)
+
+        self.assertIs(first_api.rate_limiter, second_api.rate_limiter)
+        self.assertIn('api.anymarket.com.br', rate_limiters.limiters)
+
+
+class TestSlidingWindowLimiter(unittest.TestCase):
+    def test_blocks_once_window_is_full(self):
+        limiter = SlidingWindowLimiter(max_requests=2, period=0.05)
+        start = time.monotonic()
+
+        for _ in range(3):
+            limiter.acquire()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.045)
+        self.assertEqual(len(limiter.requests), 1)
+
+    def test_rejects_non_positive_quota(self):
+        with self.assertRaises(ValueError):
+            SlidingWindowLimiter(max_requests=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
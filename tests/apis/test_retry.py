@@ -0,0 +1,104 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import MagicMock, patch
+
+import httpx
+
+from kami_pricing.api.retry import RetryPolicy
+
+
+def build_response(status_code: int, headers: dict = None) -> httpx.Response:
+    return httpx.Response(status_code, headers=headers)
+
+
+@patch('kami_pricing.api.retry.time.sleep')
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3)
+
+    def test_retries_transient_status_until_success(self, mock_sleep):
+        request = MagicMock(
+            side_effect=[build_response(503), build_response(200)]
+        )
+
+        response = self.policy.send('GET', '/v2/products/123', request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(
+            self.policy.get_retry_counts(), {'GET /v2/products/{id}': 1}
+        )
+        mock_sleep.assert_called_once()
+
+    def test_returns_last_response_after_max_attempts(self, mock_sleep):
+        request = MagicMock(return_value=build_response(502))
+
+        response = self.policy.send('GET', '/v2/products', request)
+
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_does_not_retry_non_idempotent_methods_on_server_errors(
+        self, mock_sleep
+    ):
+        request = MagicMock(return_value=build_response(500))
+
+        response = self.policy.send('PATCH', '/v2/products/1', request)
+
+        self.assertEqual(response.status_code, 500)
+        request.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_retries_too_many_requests_for_any_method(self, mock_sleep):
+        request = MagicMock(
+            side_effect=[
+                build_response(429, {'Retry-After': '2'}),
+                build_response(200),
+            ]
+        )
+
+        response = self.policy.send('POST', '/oauth/token', request)
+
+        self.assertEqual(response.status_code, 200)
+        mock_sleep.assert_called_once_with(2.0)
+
+    def test_retries_transport_errors(self, mock_sleep):
+        request = MagicMock(
+            side_effect=[httpx.ConnectError('refused'), build_response(200)]
+        )
+
+        response = self.policy.send('PUT', '/skus/K1', request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.policy.get_retry_counts(), {'PUT /skus/{id}': 1})
+
+    def test_raises_transport_error_after_max_attempts(self, mock_sleep):
+        request = MagicMock(side_effect=httpx.ReadTimeout('timeout'))
+
+        with self.assertRaises(httpx.ReadTimeout):
+            self.policy.send('GET', '/v2/products', request)
+        self.assertEqual(request.call_count, 3)
+
+    def test_retry_after_http_date(self, mock_sleep):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=10)
+        response = build_response(
+            503, {'Retry-After': format_datetime(retry_at, usegmt=True)}
+        )
+
+        self.assertAlmostEqual(
+            self.policy.get_retry_after(response), 10, delta=1.5
+        )
+
+    def test_backoff_grows_exponentially_with_jitter(self, mock_sleep):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+
+        for attempt, backoff in [(1, 1), (2, 2), (3, 4), (6, 5)]:
+            delay = policy.get_backoff(attempt)
+            self.assertGreaterEqual(delay, backoff / 2)
+            self.assertLessEqual(delay, backoff)
+
+
+if __name__ == '__main__':
+    unittest.main()
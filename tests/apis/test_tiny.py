@@ -1,13 +1,15 @@
 import json
+import threading
 import unittest
 from unittest.mock import MagicMock, mock_open, patch
 
+from kami_pricing.api.cache import ResponseCache, get_cache_scope
 from kami_pricing.api.tiny import TinyAPI, TinyAPIError
 
 
 class TestTinyAPI(unittest.TestCase):
     def setUp(self):
-        self.tiny_api = TinyAPI()
+        self.tiny_api = TinyAPI(product_cache=ResponseCache())
         self.tiny_api.credentials_path = 'dummy/path/to/credentials.json'
 
     @patch('builtins.open', mock_open(read_data='{"token": "your_token"}'))
@@ -55,6 +57,91 @@ class TestTinyAPI(unittest.TestCase):
             'Failed to get credentials: Generic error', str(context.exception)
         )
 
+    @patch('httpx.Client.post')
+    def test_connect_returns_result_and_sends_form_data(self, mock_post):
+        mock_post.return_value = MagicMock(
+            status_code=200, json=lambda: {'retorno': {'status': 'OK'}}
+        )
+        self.tiny_api.credentials = {'token': 'token'}
+
+        result = self.tiny_api._connect(
+            endpoint='produtos.pesquisa.php', query='K1'
+        )
+
+        self.assertEqual(result, {'retorno': {'status': 'OK'}})
+        self.assertEqual(
+            mock_post.call_args.kwargs['data'],
+            {'token': 'token', 'pesquisa': 'K1', 'formato': 'JSON'},
+        )
+
+    @patch('kami_pricing.api.tiny.TinyAPI._connect')
+    def test_get_product_by_sku(self, mock_connect):
+        mock_connect.return_value = {
+            'retorno': {
+                'status': 'OK',
+                'produtos': [{'produto': {'codigo': 'K1', 'preco': '10.00'}}],
+            }
+        }
+
+        product = self.tiny_api.get_product_by_sku('K1')
+
+        self.assertEqual(product, {'codigo': 'K1', 'preco': '10.00'})
+
+    @patch('kami_pricing.api.tiny.TinyAPI.get_product_by_sku')
+    def test_get_products_list_by_sku_keeps_order_and_errors(
+        self, mock_get_product_by_sku
+    ):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def get_product_by_sku(sku):
+            barrier.wait()
+            if sku == 'K2':
+                raise TinyAPIError('Produto nao encontrado')
+            return {'codigo': sku}
+
+        mock_get_product_by_sku.side_effect = get_product_by_sku
+        self.tiny_api.credentials = {'token': 'token'}
+        self.tiny_api.max_workers = 3
+
+        products = self.tiny_api.get_products_list_by_sku(['K1', 'K2', 'K3'])
+
+        self.assertEqual(products[0], {'codigo': 'K1'})
+        self.assertEqual(products[1]['sku'], 'K2')
+        self.assertIn('Produto nao encontrado', products[1]['error'])
+        self.assertEqual(products[2], {'codigo': 'K3'})
+
+    @patch('kami_pricing.api.tiny.TinyAPI.get_product_by_sku')
+    def test_get_products_list_by_sku_caches_products(
+        self, mock_get_product_by_sku
+    ):
+        mock_get_product_by_sku.side_effect = lambda sku: {'codigo': sku}
+        self.tiny_api.credentials = {'token': 'token'}
+
+        self.tiny_api.get_products_list_by_sku(['K1', 'K2'])
+        self.tiny_api.get_products_list_by_sku(['K1', 'K2'])
+        self.assertEqual(mock_get_product_by_sku.call_count, 2)
+
+        self.tiny_api.product_cache.invalidate(
+            get_cache_scope(self.tiny_api.base_url, 'token') + 'K1'
+        )
+        self.tiny_api.get_products_list_by_sku(['K1', 'K2'])
+        self.assertEqual(mock_get_product_by_sku.call_count, 3)
+        self.assertEqual(self.tiny_api.product_cache.get_metrics()['hits'], 3)
+
+    @patch('kami_pricing.api.tiny.TinyAPI.get_product_by_sku')
+    def test_product_cache_is_scoped_to_the_account(
+        self, mock_get_product_by_sku
+    ):
+        mock_get_product_by_sku.side_effect = lambda sku: {'codigo': sku}
+        self.tiny_api.credentials = {'token': 'token'}
+        other_api = TinyAPI(product_cache=self.tiny_api.product_cache)
+        other_api.credentials = {'token': 'other-token'}
+
+        self.tiny_api.get_products_list_by_sku(['K1'])
+        other_api.get_products_list_by_sku(['K1'])
+
+        self.assertEqual(mock_get_product_by_sku.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
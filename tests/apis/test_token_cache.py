@@ -0,0 +1,89 @@
+import tempfile
+import threading
+import time
+import unittest
+from os import path
+from unittest.mock import MagicMock
+
+from kami_pricing.api.token_cache import AccessToken, TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+    def test_token_is_reused_until_refresh_margin(self):
+        cache = TokenCache(refresh_margin=60)
+        fetch = MagicMock(side_effect=[('token-1', 3600), ('token-2', 3600)])
+
+        self.assertEqual(cache.get('key', fetch), 'token-1')
+        self.assertEqual(cache.get('key', fetch), 'token-1')
+        fetch.assert_called_once()
+
+    def test_token_is_refreshed_before_expiry(self):
+        cache = TokenCache(refresh_margin=60)
+        fetch = MagicMock(side_effect=[('token-1', 30), ('token-2', 3600)])
+
+        self.assertEqual(cache.get('key', fetch), 'token-1')
+        self.assertEqual(cache.get('key', fetch), 'token-2')
+
+    def test_invalidate_forces_new_token(self):
+        cache = TokenCache()
+        fetch = MagicMock(side_effect=[('token-1', 3600), ('token-2', 3600)])
+
+        cache.get('key', fetch)
+        cache.invalidate('key')
+
+        self.assertEqual(cache.get('key', fetch), 'token-2')
+
+    def test_invalidate_keeps_a_token_refreshed_meanwhile(self):
+        token_cache = TokenCache()
+        token_cache.get('key', lambda: ('token-1', 3600))
+        token_cache.invalidate('key', if_token='token-1')
+        token_cache.get('key', lambda: ('token-2', 3600))
+
+        token_cache.invalidate('key', if_token='token-1')
+
+        fetch = MagicMock(return_value=('token-3', 3600))
+        self.assertEqual(token_cache.get('key', fetch), 'token-2')
+        fetch.assert_not_called()
+
+    def test_concurrent_callers_share_a_single_refresh(self):
+        cache = TokenCache()
+        fetch_count = []
+
+        def fetch():
+            fetch_count.append(1)
+            time.sleep(0.05)
+            return 'token', 3600
+
+        threads = [
+            threading.Thread(target=cache.get, args=('key', fetch))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(fetch_count), 1)
+
+    def test_file_backed_cache_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = path.join(tmp_dir, 'tokens.json')
+            TokenCache(cache_path=cache_path).get(
+                'key', lambda: ('token-1', 3600)
+            )
+            fetch = MagicMock(return_value=('token-2', 3600))
+
+            token = TokenCache(cache_path=cache_path).get('key', fetch)
+
+            self.assertEqual(token, 'token-1')
+            fetch.assert_not_called()
+
+    def test_access_token_validity(self):
+        token = AccessToken('token', time.time() + 100)
+
+        self.assertTrue(token.is_valid())
+        self.assertFalse(token.is_valid(refresh_margin=200))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import statistics
+import subprocess
+import sys
+
+IMPORT_STATEMENTS = {
+    'kami_pricing.pricing_manager': 'import kami_pricing.pricing_manager',
+    # what the import used to cost, with the google clients loaded eagerly
+    'kami_pricing.pricing_manager + kami_gsuite': (
+        'import kami_pricing.pricing_manager, kami_gsuite.kami_gsheet'
+    ),
+}
+
+
+def time_import(statement: str) -> float:
+    result = subprocess.run(
+        [
+            sys.executable,
+            '-c',
+            'import time; start = time.perf_counter(); '
+            f'{statement}; print(time.perf_counter() - start)',
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark_imports(repeat: int = 7):
+    for name, statement in IMPORT_STATEMENTS.items():
+        timings = [time_import(statement) for _ in range(repeat)]
+        print(f'{name}: {statistics.median(timings) * 1000:.0f} ms (median)')
+
+
+if __name__ == '__main__':
+    benchmark_imports()
@@ -0,0 +1,68 @@
+import logging
+import os
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from os import path
+
+from kami_pricing.scraper import (
+    ParsingStage,
+    extract_sellers,
+    extract_sellers_fast,
+    extract_sellers_with_soup,
+)
+
+FIXTURES_DIR = path.join(path.dirname(__file__), 'fixtures', 'beleza_na_web')
+
+
+def load_fixture_pages():
+    pages = []
+    for fixture in sorted(glob(path.join(FIXTURES_DIR, '*.html'))):
+        with open(fixture, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+def benchmark_html_parsers(repeat: int = 20):
+    pages = load_fixture_pages()
+    for html_parser, extract in (
+        ('soup', extract_sellers_with_soup),
+        ('fast', extract_sellers_fast),
+    ):
+        elapsed = timeit.timeit(
+            lambda: [extract(page) for page in pages], number=repeat
+        )
+        per_page = elapsed / (repeat * len(pages)) * 1000
+        print(f'{html_parser}: {per_page:.2f} ms/page')
+
+
+def benchmark_parse_workers(
+    total_pages: int = 600, html_parser: str = 'soup', chunk_size: int = 16
+):
+    fixture_pages = load_fixture_pages()
+    pages = [fixture_pages[i % len(fixture_pages)] for i in range(total_pages)]
+    workers_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in workers_counts:
+        executor = ProcessPoolExecutor(workers) if workers > 1 else None
+        start = time.perf_counter()
+        if executor is None:
+            for page in pages:
+                extract_sellers(page, html_parser)
+        else:
+            with executor:
+                parsing_stage = ParsingStage(executor, html_parser, chunk_size)
+                for index, page in enumerate(pages):
+                    parsing_stage.submit(index, page)
+                parsing_stage.get_results()
+        elapsed = time.perf_counter() - start
+        print(
+            f'{html_parser} with {workers} workers: {total_pages / elapsed:.0f} pages/s'
+        )
+
+
+if __name__ == '__main__':
+    logging.disable(logging.CRITICAL)
+    benchmark_html_parsers()
+    benchmark_parse_workers(total_pages=120, html_parser='soup')
+    benchmark_parse_workers(total_pages=3000, html_parser='fast')
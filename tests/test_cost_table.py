@@ -0,0 +1,128 @@
+import tempfile
+import unittest
+from os import path
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+
+from kami_pricing.cost_table import CostTable, CostTableError, get_cost_table
+from kami_pricing.pricing import Pricing
+
+COSTS_SHEET = pd.DataFrame(
+    {
+        'sku': ['K001', 'K002', 'K002', 'K003'],
+        'CUSTO': ['10,5', '3', '9', '7,25'],
+        'FRETE': ['1', 'None', '2', '0,8'],
+        'INSUMO': ['0,3', '#N/A', '1', '0'],
+    }
+)
+PRICING_DF = pd.DataFrame(
+    {
+        'sku (*)': ['K002', 'K004', 'K001', 'K003'],
+        'special_price': [20.0, 5.0, 30.0, 12.9],
+    },
+    index=[5, 7, 9, 11],
+)
+
+
+class TestCostTable(unittest.TestCase):
+    def setUp(self):
+        self.gsheet = MagicMock()
+        self.gsheet.convert_range_to_dataframe.return_value = COSTS_SHEET
+        self.cost_table = CostTable(
+            sheet_range='custos!A1:D', gsheet=self.gsheet
+        )
+
+    def test_join_adds_cost_columns_per_sku(self):
+        df_ebitda = self.cost_table.join(PRICING_DF)
+
+        self.assertEqual(
+            list(df_ebitda.columns),
+            ['sku (*)', 'special_price', 'CUSTO', 'FRETE', 'INSUMO'],
+        )
+        self.assertEqual(list(df_ebitda.index), [0, 1, 2, 3])
+        self.assertEqual(
+            list(df_ebitda['CUSTO'].fillna(-1)), [3, -1, 10.5, 7.25]
+        )
+        self.assertTrue(df_ebitda.loc[0, ['FRETE', 'INSUMO']].isna().all())
+
+    def test_costs_are_reloaded_only_after_ttl(self):
+        with patch('kami_pricing.cost_table.time.monotonic') as mock_time:
+            mock_time.return_value = 1000.0
+            self.cost_table.join(PRICING_DF)
+            mock_time.return_value = 1000.0 + self.cost_table.ttl - 1
+            self.cost_table.join(PRICING_DF)
+            self.assertEqual(
+                self.gsheet.convert_range_to_dataframe.call_count, 1
+            )
+
+            mock_time.return_value = 1000.0 + self.cost_table.ttl
+            self.cost_table.join(PRICING_DF)
+            self.assertEqual(
+                self.gsheet.convert_range_to_dataframe.call_count, 2
+            )
+
+    def test_loads_costs_from_local_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = path.join(tmp_dir, 'costs.csv')
+            with open(file_path, 'w') as f:
+                f.write('sku;CUSTO;FRETE;INSUMO\nK001;10,5;1;0,3\n')
+            cost_table = CostTable(file_path=file_path, gsheet=self.gsheet)
+
+            costs = cost_table.get_costs()
+
+        self.assertEqual(costs.loc['K001'].tolist(), [10.5, 1.0, 0.3])
+        self.gsheet.convert_range_to_dataframe.assert_not_called()
+
+    def test_requires_a_sheet_range_or_a_file_path(self):
+        with self.assertRaises(CostTableError):
+            CostTable(gsheet=self.gsheet)
+
+    def test_get_cost_table_shares_tables_with_the_same_settings(self):
+        cost_table = get_cost_table(sheet_range='custos!A1:D', ttl=60)
+
+        self.assertIs(
+            get_cost_table(ttl=60, sheet_range='custos!A1:D'), cost_table
+        )
+        self.assertIsNot(
+            get_cost_table(sheet_range='custos!A1:D', ttl=120), cost_table
+        )
+
+    def test_missing_cost_columns_raise(self):
+        self.gsheet.convert_range_to_dataframe.return_value = COSTS_SHEET[
+            ['sku', 'CUSTO']
+        ]
+
+        with self.assertRaises(CostTableError):
+            self.cost_table.get_costs()
+
+    @patch('kami_pricing.pricing.get_gsheet')
+    def test_matches_spreadsheet_round_trip(self, mock_get_gsheet):
+        # what the ebit sheet returns after looking the costs up
+        costs = self.cost_table.get_costs()
+        sheet_rows = [
+            [sku, str(price), *costs.reindex([sku]).iloc[0].astype(str)]
+            for sku, price in zip(
+                PRICING_DF['sku (*)'], PRICING_DF['special_price']
+            )
+        ]
+        sheet_df = pd.DataFrame(
+            sheet_rows,
+            columns=['sku (*)', 'special_price', 'CUSTO', 'FRETE', 'INSUMO'],
+        )
+        gsheet = mock_get_gsheet.return_value
+        gsheet.convert_range_to_dataframe.return_value = sheet_df.replace(
+            'nan', 'None'
+        )
+
+        sheet_ebitda = Pricing().ebitda_proccess(PRICING_DF)
+        local_ebitda = Pricing(cost_table=self.cost_table).ebitda_proccess(
+            PRICING_DF
+        )
+
+        pd.testing.assert_frame_equal(local_ebitda, sheet_ebitda)
+        self.assertEqual(mock_get_gsheet.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
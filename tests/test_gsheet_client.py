@@ -0,0 +1,46 @@
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from kami_pricing import gsheet_client
+
+
+class TestGsheetClient(unittest.TestCase):
+    def setUp(self):
+        gsheet_client._gsheet = None
+
+    def tearDown(self):
+        gsheet_client._gsheet = None
+
+    @patch('kami_gsuite.kami_gsheet.KamiGsheet')
+    def test_client_is_created_once_and_shared(self, MockKamiGsheet):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            clients = list(
+                executor.map(lambda _: gsheet_client.get_gsheet(), range(16))
+            )
+
+        MockKamiGsheet.assert_called_once()
+        MockKamiGsheet.return_value.connect.assert_called_once()
+        self.assertTrue(
+            all(client is MockKamiGsheet.return_value for client in clients)
+        )
+
+    def test_importing_the_package_does_not_load_google_clients(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                'import sys, kami_pricing.pricing_manager; '
+                "print('kami_gsuite' in sys.modules)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import tempfile
+import time
+import unittest
+from os import path
+
+from kami_pricing.page_cache import PageCache, PageSnapshot
+
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.page_cache = PageCache(
+            db_path=path.join(self.tmp_dir.name, 'data', 'page_cache.sqlite')
+        )
+        self.snapshot = PageSnapshot(
+            url='https://www.belezanaweb.com.br/p1',
+            etag='"abc"',
+            last_modified='Wed, 14 Oct 2026 10:00:00 GMT',
+            content_hash='hash',
+            sellers=[['B001', 'Wella', 'Cabelos', 'Produto', 89.9, 'LOJA']],
+            fetched_at=time.time(),
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_snapshots_round_trip(self):
+        self.page_cache.save_snapshots([self.snapshot])
+
+        snapshots = self.page_cache.get_snapshots(
+            [self.snapshot.url, 'https://www.belezanaweb.com.br/p2']
+        )
+
+        self.assertEqual(snapshots, {self.snapshot.url: self.snapshot})
+
+    def test_get_snapshots_queries_more_urls_than_one_statement_takes(self):
+        snapshots = [
+            PageSnapshot(
+                url=f'https://www.belezanaweb.com.br/p{index}',
+                etag=None,
+                last_modified=None,
+                content_hash='hash',
+                sellers=[],
+                fetched_at=time.time(),
+            )
+            for index in range(1200)
+        ]
+        self.page_cache.save_snapshots(snapshots)
+
+        urls = [snapshot.url for snapshot in snapshots[1:]]
+        loaded = self.page_cache.get_snapshots(urls + urls[:10])
+
+        self.assertCountEqual(loaded, urls)
+
+    def test_conditional_headers(self):
+        self.assertEqual(
+            self.snapshot.get_conditional_headers(),
+            {
+                'If-None-Match': '"abc"',
+                'If-Modified-Since': 'Wed, 14 Oct 2026 10:00:00 GMT',
+            },
+        )
+        self.snapshot.etag = None
+        self.snapshot.last_modified = None
+        self.assertEqual(self.snapshot.get_conditional_headers(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
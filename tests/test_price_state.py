@@ -0,0 +1,70 @@
+import tempfile
+import time
+import unittest
+from os import path
+
+import pandas as pd
+
+from kami_pricing.price_state import PriceStateStore
+
+
+class TestPriceStateStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = PriceStateStore(
+            db_path=path.join(self.tmp_dir.name, 'data', 'price_state.sqlite')
+        )
+        self.pricing_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3'],
+                'special_price': [10.0, 20.5, 30.99],
+            }
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_all_prices_are_changed_without_state(self):
+        changed_df = self.store.get_changed_prices(
+            'HAIRPRO', 'BELEZA_NA_WEB', self.pricing_df
+        )
+        self.assertEqual(len(changed_df), 3)
+
+    def test_only_changed_prices_are_returned(self):
+        self.store.save_prices('HAIRPRO', 'BELEZA_NA_WEB', self.pricing_df)
+        new_pricing_df = pd.DataFrame(
+            {
+                'sku (*)': ['K1', 'K2', 'K3', 'K4'],
+                'special_price': [10.000000001, 21.0, 30.99, 5.0],
+            }
+        )
+
+        changed_df = self.store.get_changed_prices(
+            'HAIRPRO', 'BELEZA_NA_WEB', new_pricing_df
+        )
+
+        self.assertEqual(list(changed_df['sku (*)']), ['K2', 'K4'])
+
+    def test_state_is_kept_per_company_and_marketplace(self):
+        self.store.save_prices('HAIRPRO', 'BELEZA_NA_WEB', self.pricing_df)
+
+        changed_df = self.store.get_changed_prices(
+            'HAIRPRO', 'AMAZON', self.pricing_df
+        )
+
+        self.assertEqual(len(changed_df), 3)
+
+    def test_old_prices_are_sent_again(self):
+        self.store.save_prices('HAIRPRO', 'BELEZA_NA_WEB', self.pricing_df)
+        self.store.resend_after = 0
+        time.sleep(0.01)
+
+        changed_df = self.store.get_changed_prices(
+            'HAIRPRO', 'BELEZA_NA_WEB', self.pricing_df
+        )
+
+        self.assertEqual(len(changed_df), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from kami_pricing.pricing import Pricing
+
+
+def build_ebitda_df(size: int = 12, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            'sku (*)': [f'SKU{i:03d}' for i in range(size)],
+            'special_price': rng.uniform(10, 40, size).round(2),
+            'CUSTO': rng.uniform(1, 20, size).round(2),
+            'FRETE': rng.uniform(0, 8, size).round(2),
+            'INSUMO': rng.uniform(0, 2, size).round(2),
+        }
+    )
+
+
+SELLERS_LIST = [
+    ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 89.9, 'HAIRPRO'],
+    ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 84.5, 'LOJA A'],
+    ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 86.0, 'LOJA B'],
+    ['B002', 'Redken', 'Cabelos', 'Mascara 250g', 120.0, 'HAIRPRO'],
+    ['B002', 'Redken', 'Cabelos', 'Mascara 250g', 125.3, 'LOJA A'],
+    ['B003', 'Loreal', 'Cabelos', 'Oleo 100ml', 59.9, 'HAIRPRO'],
+    ['B004', 'Kerastase', 'Cabelos', 'Serum 50ml', 210.0, 'LOJA C'],
+    ['B004', 'Kerastase', 'Cabelos', 'Serum 50ml', 199.9, 'HAIRPRO'],
+    ['B004', 'Kerastase', 'Cabelos', 'Serum 50ml', 205.5, 'LOJA B'],
+]
+# hairpro is never more expensive than the cheapest competitor, so the
+# legacy price fallback decides the suggested prices
+CHEAPER_SELLERS_LISTS = {
+    'first sku matched': [
+        ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 90.0, 'HAIRPRO'],
+        ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 80.0, 'LOJA A'],
+        ['B002', 'Redken', 'Cabelos', 'Mascara 250g', 100.0, 'HAIRPRO'],
+        ['B002', 'Redken', 'Cabelos', 'Mascara 250g', 85.0, 'LOJA B'],
+        ['B003', 'Loreal', 'Cabelos', 'Oleo 100ml', 95.0, 'HAIRPRO'],
+    ],
+    'first sku unmatched': [
+        ['B003', 'Loreal', 'Cabelos', 'Oleo 100ml', 95.0, 'HAIRPRO'],
+        ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 90.0, 'HAIRPRO'],
+        ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 80.0, 'LOJA A'],
+        ['B002', 'Redken', 'Cabelos', 'Mascara 250g', 100.0, 'HAIRPRO'],
+        ['B002', 'Redken', 'Cabelos', 'Mascara 250g', 85.0, 'LOJA B'],
+    ],
+    'only sku matched': [
+        ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 90.0, 'HAIRPRO'],
+        ['B001', 'Wella', 'Cabelos', 'Shampoo 1L', 80.0, 'LOJA A'],
+    ],
+}
+SKUS_LIST = pd.DataFrame(
+    {
+        'SKU Seller': ['K001', 'K002', 'K003', 'K004'],
+        'SKU Beleza': ['B001', 'B002', 'B003', 'B004'],
+    }
+)
+
+
+class TestPricing(unittest.TestCase):
+    def test_vectorized_solver_matches_iterative_solver(self):
+        df = build_ebitda_df()
+
+        iterative = Pricing(solver='iterative').pricing(df.copy())
+        vectorized = Pricing(solver='vectorized').pricing(df.copy())
+
+        pd.testing.assert_frame_equal(vectorized, iterative, check_exact=True)
+
+    def test_vectorized_solver_reaches_ebitda_floor(self):
+        pc = Pricing()
+        df = pc.pricing(build_ebitda_df(seed=7))
+
+        self.assertTrue((df['EBITDA %'] >= pc.limit_rate_ebitda).all())
+
+    def test_vectorized_solver_keeps_prices_above_floor(self):
+        df = pd.DataFrame(
+            {
+                'sku (*)': ['SKU001'],
+                'special_price': [100.0],
+                'CUSTO': [10.0],
+                'FRETE': [5.0],
+                'INSUMO': [1.0],
+            }
+        )
+
+        result = Pricing().pricing(df)
+
+        self.assertEqual(result.loc[0, 'special_price'], 100.0)
+
+    def test_unsupported_solver_returns_none(self):
+        self.assertIsNone(Pricing(solver='unknown').pricing(build_ebitda_df()))
+
+    def test_merge_engine_matches_legacy_engine(self):
+        legacy = Pricing(matching_engine='legacy').create_dataframes(
+            sellers_list=SELLERS_LIST, skus_list=SKUS_LIST
+        )
+        merged = Pricing(matching_engine='merge').create_dataframes(
+            sellers_list=SELLERS_LIST, skus_list=SKUS_LIST
+        )
+
+        pd.testing.assert_frame_equal(merged, legacy, check_exact=True)
+
+    def test_merge_engine_matches_legacy_engine_when_hairpro_is_cheaper(
+        self,
+    ):
+        for name, sellers_list in CHEAPER_SELLERS_LISTS.items():
+            with self.subTest(sellers_list=name):
+                legacy = Pricing(matching_engine='legacy').create_dataframes(
+                    sellers_list=sellers_list, skus_list=SKUS_LIST
+                )
+                merged = Pricing(matching_engine='merge').create_dataframes(
+                    sellers_list=sellers_list, skus_list=SKUS_LIST
+                )
+
+                pd.testing.assert_frame_equal(merged, legacy, check_exact=True)
+
+    def test_merge_engine_keeps_hairpro_price_when_it_is_cheaper(self):
+        df = Pricing().create_dataframes(
+            sellers_list=CHEAPER_SELLERS_LISTS['first sku matched'],
+            skus_list=SKUS_LIST,
+        )
+
+        self.assertEqual(list(df['sku (*)']), ['K001', 'K002'])
+        self.assertEqual(list(df['special_price']), [90.0, 100.0])
+
+    def test_merge_engine_suggests_cheapest_competitor_price(self):
+        df = Pricing().create_dataframes(
+            sellers_list=SELLERS_LIST, skus_list=SKUS_LIST
+        )
+
+        self.assertEqual(list(df['sku (*)']), ['K001', 'K002', 'K004'])
+        self.assertEqual(list(df['competitor_price']), [84.5, 125.3, 205.5])
+
+    @patch('kami_pricing.pricing.get_gsheet')
+    def test_drop_inactives_reads_status_from_sheet_snapshot(
+        self, mock_get_gsheet
+    ):
+        sheet_snapshot = MagicMock()
+        sheet_snapshot.get_dataframe.return_value = pd.DataFrame(
+            {'sku': ['K001', 'K002'], 'status': ['INATIVO', 'ATIVO']}
+        )
+        pricing = Pricing(sheet_snapshot=sheet_snapshot)
+        pricing_df = pd.DataFrame(
+            {'sku (*)': ['K001', 'K002'], 'special_price': [10.0, 20.0]}
+        )
+
+        result = pricing.drop_inactives(pricing_df)
+
+        self.assertEqual(list(result['sku (*)']), ['K002'])
+        sheet_snapshot.get_dataframe.assert_called_once_with('sku!A1:B')
+        mock_get_gsheet.assert_not_called()
+
+    def test_drop_inactives_loads_status_once_per_run(self):
+        pricing = Pricing()
+        pricing_df = pd.DataFrame(
+            {
+                'sku (*)': ['K001', 'K002', 'K001', 'K003'],
+                'special_price': [10.0, 20.0, 11.0, 30.0],
+            },
+            index=[0, 1, 1, 2],
+        )
+        with patch.object(
+            pricing,
+            '_get_skus_status',
+            return_value=pd.DataFrame(
+                {
+                    'sku': ['K001', 'K002', 'K003'],
+                    'status': ['INATIVO', 'ATIVO', 'INATIVO'],
+                }
+            ),
+        ) as mock_get_skus_status:
+            first = pricing.drop_inactives(pricing_df)
+            second = pricing.drop_inactives(pricing_df.iloc[1:])
+
+        mock_get_skus_status.assert_called_once()
+        self.assertEqual(pricing.inactive_skus, frozenset({'K001', 'K003'}))
+        self.assertEqual(first.to_dict('list'), second.to_dict('list'))
+        self.assertEqual(
+            first.to_dict('list'),
+            {'sku (*)': ['K002'], 'special_price': [20.0]},
+        )
+
+    def test_unsupported_matching_engine_raises(self):
+        with self.assertRaises(ValueError):
+            Pricing(matching_engine='unknown').create_dataframes(
+                sellers_list=SELLERS_LIST, skus_list=SKUS_LIST
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
+import tempfile
 import unittest
+from os import path
 from unittest.mock import MagicMock, patch
 
+import pandas as pd
+
 from kami_pricing.pricing_manager import PricingManager
 
 
@@ -34,6 +38,70 @@ class TestPricingManager(unittest.TestCase):
         with self.assertRaises(Exception):
             self.pricing_manager.scraping_and_pricing()
 
+    @patch('kami_pricing.pricing_manager.get_gsheet')
+    def test_products_come_from_one_sheet_snapshot(self, mock_get_gsheet):
+        mock_gsheet = mock_get_gsheet.return_value
+        batch_get = (
+            mock_gsheet.service.spreadsheets.return_value.values.return_value.batchGet
+        )
+        batch_get.return_value.execute.return_value = {
+            'valueRanges': [
+                {'values': [['urls'], ['https://www.belezanaweb.com.br/p1']]},
+                {'values': [['SKU Seller', 'SKU Beleza'], ['K001', 'B001']]},
+                {'values': [['sku', 'status'], ['K001', 'ATIVO']]},
+            ]
+        }
+
+        urls, sku_sellers = self.pricing_manager.get_products_from_company()
+
+        self.assertEqual(urls, ['https://www.belezanaweb.com.br/p1'])
+        self.assertEqual(list(sku_sellers['SKU Beleza']), ['B001'])
+        batch_get.assert_called_once()
+        self.assertEqual(
+            batch_get.call_args.kwargs['ranges'],
+            ['pricing!A1:A', 'skushairpro!A1:B', 'sku!A1:B'],
+        )
+        mock_gsheet.convert_range_to_dataframe.assert_not_called()
+        self.assertEqual(
+            list(
+                self.pricing_manager.sheet_snapshot.get_dataframe('sku!A1:B')[
+                    'status'
+                ]
+            ),
+            ['ATIVO'],
+        )
+
+    def test_update_prices_skips_unchanged_prices(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            pricing_manager = PricingManager(
+                company='HAIRPRO',
+                marketplace='BELEZA_NA_WEB',
+                integrator='ANYMARKET',
+                price_state_path=path.join(tmp_dir, 'price_state.sqlite'),
+            )
+            pricing_manager.integrator_api = MagicMock()
+            update_prices = (
+                pricing_manager.integrator_api.update_prices_on_marketplace
+            )
+            update_prices.side_effect = lambda pricing_df, marketplace: (
+                pricing_df.assign(success=pricing_df['sku (*)'] != 'K2')
+            )
+            pricing_df = pd.DataFrame(
+                {'sku (*)': ['K1', 'K2'], 'special_price': [10.0, 20.0]}
+            )
+
+            pricing_manager.update_prices(pricing_df)
+            pricing_manager.update_prices(pricing_df)
+
+            self.assertEqual(update_prices.call_count, 2)
+            self.assertEqual(
+                list(update_prices.call_args.kwargs['pricing_df']['sku (*)']),
+                ['K2'],
+            )
+            self.assertEqual(
+                pricing_manager.update_counters, {'sent': 1, 'skipped': 1}
+            )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,353 @@
+import asyncio
+import html
+import json
+import tempfile
+import time
+import unittest
+from glob import glob
+from os import path
+from unittest.mock import MagicMock, patch
+
+from kami_pricing.page_cache import PageCache
+from kami_pricing.scraper import (
+    HostRateLimiter,
+    ParsingStage,
+    Scraper,
+    extract_sellers_fast,
+    extract_sellers_with_soup,
+)
+
+
+def build_product_page(sku: str, sellers: list) -> bytes:
+    buttons = ''
+    for seller_name, price in sellers:
+        data_sku = json.dumps(
+            [
+                {
+                    'sku': sku,
+                    'brand': 'Wella',
+                    'category': 'Cabelos',
+                    'name': f'Produto {sku}',
+                    'price': price,
+                    'seller': {'id': seller_name.lower(), 'name': seller_name},
+                }
+            ]
+        )
+        buttons += (
+            '<a class="btn btn-block btn-primary btn-lg js-add-to-cart" '
+            f'data-sku="{html.escape(data_sku)}">Comprar</a>'
+        )
+    return f'<html><body><div>{buttons}</div></body></html>'.encode()
+
+
+PAGES = {
+    'https://www.belezanaweb.com.br/p1': build_product_page(
+        'B001', [('HAIRPRO', 89.9), ('LOJA A', 84.5)]
+    ),
+    'https://www.belezanaweb.com.br/p2': build_product_page(
+        'B002', [('HAIRPRO', 120.0)]
+    ),
+    'https://www.belezanaweb.com.br/p3': build_product_page(
+        'B003', [('LOJA B', 59.9), ('HAIRPRO', 61.0)]
+    ),
+}
+FIXTURES_DIR = path.join(path.dirname(__file__), 'fixtures', 'beleza_na_web')
+EXPECTED_SELLERS = [
+    ['B001', 'Wella', 'Cabelos', 'Produto B001', 89.9, 'HAIRPRO'],
+    ['B001', 'Wella', 'Cabelos', 'Produto B001', 84.5, 'LOJA A'],
+    ['B002', 'Wella', 'Cabelos', 'Produto B002', 120.0, 'HAIRPRO'],
+    ['B003', 'Wella', 'Cabelos', 'Produto B003', 59.9, 'LOJA B'],
+    ['B003', 'Wella', 'Cabelos', 'Produto B003', 61.0, 'HAIRPRO'],
+]
+
+
+class TestScraper(unittest.TestCase):
+    def setUp(self):
+        self.scraper = Scraper(products_urls=list(PAGES))
+
+    def test_extract_sellers(self):
+        sellers = self.scraper._extract_sellers(
+            PAGES['https://www.belezanaweb.com.br/p1']
+        )
+        self.assertEqual(sellers, EXPECTED_SELLERS[:2])
+
+    @patch('kami_pricing.scraper.requests.get')
+    def test_sync_engine(self, mock_get):
+        mock_get.side_effect = lambda url, headers: MagicMock(
+            status_code=200, content=PAGES[url], headers={}
+        )
+        self.scraper.engine = 'sync'
+
+        sellers = self.scraper.scrap_products_from_marketplace()
+
+        self.assertEqual(sellers, EXPECTED_SELLERS)
+
+    def test_async_engine_keeps_input_order(self):
+        delays = {url: 0.03 - i * 0.01 for i, url in enumerate(PAGES)}
+
+        async def fake_fetch_page(
+            session, semaphore, rate_limiter, url, headers=None
+        ):
+            await asyncio.sleep(delays[url])
+            return 200, PAGES[url], {}
+
+        with patch.object(
+            self.scraper, '_fetch_page', side_effect=fake_fetch_page
+        ):
+            sellers = self.scraper.scrap_products_from_marketplace()
+
+        self.assertEqual(sellers, EXPECTED_SELLERS)
+
+    def test_async_engine_skips_failed_pages(self):
+        async def fake_fetch_page(
+            session, semaphore, rate_limiter, url, headers=None
+        ):
+            if url.endswith('p2'):
+                return None, None, {}
+            return 200, PAGES[url], {}
+
+        with patch.object(
+            self.scraper, '_fetch_page', side_effect=fake_fetch_page
+        ):
+            sellers = self.scraper.scrap_products_from_marketplace()
+
+        self.assertEqual(sellers, EXPECTED_SELLERS[:2] + EXPECTED_SELLERS[3:])
+
+    def test_fast_parser_matches_soup_parser_on_fixtures(self):
+        fixtures = sorted(glob(path.join(FIXTURES_DIR, '*.html')))
+        self.assertTrue(fixtures)
+        for fixture in fixtures:
+            with self.subTest(fixture=path.basename(fixture)):
+                with open(fixture, 'rb') as f:
+                    content = f.read()
+                fast_sellers = extract_sellers_fast(content)
+                soup_sellers = extract_sellers_with_soup(content)
+                self.assertTrue(fast_sellers)
+                self.assertEqual(fast_sellers, soup_sellers)
+
+    def test_fast_parser_ignores_buttons_in_scripts(self):
+        page = PAGES['https://www.belezanaweb.com.br/p2'].replace(
+            b'<html>',
+            b'<html><script>var tpl = \'<a class="btn btn-block btn-primary '
+            b'btn-lg js-add-to-cart" data-sku="[]">\';</script>',
+        )
+        sellers = extract_sellers_fast(page)
+        self.assertEqual(sellers, EXPECTED_SELLERS[2:3])
+
+    @patch('kami_pricing.scraper.requests.get')
+    def test_sync_engine_with_parsing_processes(self, mock_get):
+        mock_get.side_effect = lambda url, headers: MagicMock(
+            status_code=200, content=PAGES[url], headers={}
+        )
+        self.scraper.engine = 'sync'
+        self.scraper.parse_workers = 2
+        self.scraper.parse_chunk_size = 2
+
+        sellers = self.scraper.scrap_products_from_marketplace()
+
+        self.assertEqual(sellers, EXPECTED_SELLERS)
+
+    def test_async_engine_with_parsing_processes(self):
+        async def fake_fetch_page(
+            session, semaphore, rate_limiter, url, headers=None
+        ):
+            if url.endswith('p2'):
+                return None, None, {}
+            return 200, PAGES[url], {}
+
+        self.scraper.parse_workers = 2
+        self.scraper.parse_chunk_size = 1
+        with patch.object(
+            self.scraper, '_fetch_page', side_effect=fake_fetch_page
+        ), patch.object(
+            self.scraper, '_extract_sellers', side_effect=AssertionError
+        ):
+            sellers = self.scraper.scrap_products_from_marketplace()
+
+        self.assertEqual(sellers, EXPECTED_SELLERS[:2] + EXPECTED_SELLERS[3:])
+
+    def test_parsing_stage_submits_pages_in_chunks(self):
+        executor = MagicMock()
+        parsing_stage = ParsingStage(executor, chunk_size=2)
+        for index, content in enumerate(PAGES.values()):
+            parsing_stage.submit(index, content)
+        self.assertEqual(executor.submit.call_count, 1)
+
+        parsing_stage.flush()
+
+        self.assertEqual(executor.submit.call_count, 2)
+        self.assertEqual(
+            [keys for keys, _ in parsing_stage.futures], [[0, 1], [2]]
+        )
+
+    def test_unsupported_html_parser_raises(self):
+        self.scraper.html_parser = 'unknown'
+        with self.assertRaises(ValueError):
+            self.scraper._extract_sellers(
+                PAGES['https://www.belezanaweb.com.br/p1']
+            )
+
+    def test_unsupported_engine_raises(self):
+        self.scraper.engine = 'unknown'
+        with self.assertRaises(ValueError):
+            self.scraper.scrap_products_from_marketplace()
+
+    def test_host_rate_limiter_spaces_requests(self):
+        async def acquire_slots():
+            rate_limiter = HostRateLimiter(requests_per_second=20)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(3):
+                await rate_limiter.wait('www.belezanaweb.com.br')
+            await rate_limiter.wait('www.other-host.com.br')
+            return loop.time() - start
+
+        elapsed = asyncio.run(acquire_slots())
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.5)
+
+
+class TestScraperPageCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.page_cache = PageCache(
+            db_path=path.join(self.tmp_dir.name, 'page_cache.sqlite')
+        )
+        self.requests_headers = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def scrap(self, responses: dict, **kwargs) -> list:
+        async def fake_fetch_page(
+            session, semaphore, rate_limiter, url, headers=None
+        ):
+            self.requests_headers.append(headers)
+            return responses[url]
+
+        scraper = Scraper(
+            products_urls=list(PAGES), page_cache=self.page_cache, **kwargs
+        )
+        with patch.object(
+            scraper, '_fetch_page', side_effect=fake_fetch_page
+        ), patch.object(
+            scraper, '_extract_sellers', wraps=scraper._extract_sellers
+        ) as mock_extract_sellers:
+            sellers = scraper.scrap_products_from_marketplace()
+        return sellers, mock_extract_sellers.call_count, scraper.page_stats
+
+    def test_reuses_sellers_of_unchanged_pages(self):
+        first_responses = {
+            url: (200, content, {'ETag': f'"{i}"'})
+            for i, (url, content) in enumerate(PAGES.items())
+        }
+        self.scrap(first_responses)
+
+        second_responses = {
+            'https://www.belezanaweb.com.br/p1': (304, b'', {}),
+            'https://www.belezanaweb.com.br/p2': (
+                200,
+                PAGES['https://www.belezanaweb.com.br/p2'],
+                {},
+            ),
+            'https://www.belezanaweb.com.br/p3': (
+                200,
+                build_product_page('B003', [('LOJA B', 55.0)]),
+                {},
+            ),
+        }
+        sellers, parsed_pages, page_stats = self.scrap(second_responses)
+
+        self.assertEqual(
+            sellers,
+            EXPECTED_SELLERS[:3]
+            + [['B003', 'Wella', 'Cabelos', 'Produto B003', 55.0, 'LOJA B']],
+        )
+        self.assertEqual(parsed_pages, 1)
+        self.assertEqual(
+            page_stats,
+            {'parsed': 1, 'unchanged': 1, 'not_modified': 1, 'failed': 0},
+        )
+        self.assertEqual(self.requests_headers[3], {'If-None-Match': '"0"'})
+
+    def test_failed_pages_fall_back_to_snapshot(self):
+        self.scrap({url: (200, content, {}) for url, content in PAGES.items()})
+
+        sellers, parsed_pages, page_stats = self.scrap(
+            {url: (None, None, {}) for url in PAGES}
+        )
+
+        self.assertEqual(sellers, EXPECTED_SELLERS)
+        self.assertEqual(parsed_pages, 0)
+        self.assertEqual(page_stats['failed'], 3)
+
+    def test_error_responses_are_not_parsed(self):
+        self.scrap({url: (200, content, {}) for url, content in PAGES.items()})
+        error_page = b'<html><body>Service Unavailable</body></html>'
+        responses = {url: (200, content, {}) for url, content in PAGES.items()}
+        responses['https://www.belezanaweb.com.br/p2'] = (503, error_page, {})
+        responses['https://www.belezanaweb.com.br/p3'] = (429, error_page, {})
+
+        sellers, parsed_pages, page_stats = self.scrap(responses)
+
+        self.assertEqual(sellers, EXPECTED_SELLERS)
+        self.assertEqual(parsed_pages, 0)
+        self.assertEqual(page_stats['failed'], 2)
+        self.assertEqual(page_stats['unchanged'], 1)
+
+    def test_missing_pages_do_not_fall_back_to_snapshot(self):
+        self.scrap({url: (200, content, {}) for url, content in PAGES.items()})
+        responses = {url: (200, content, {}) for url, content in PAGES.items()}
+        responses['https://www.belezanaweb.com.br/p2'] = (404, b'gone', {})
+        responses['https://www.belezanaweb.com.br/p3'] = (410, b'gone', {})
+
+        sellers, _, page_stats = self.scrap(responses)
+
+        self.assertEqual(sellers, EXPECTED_SELLERS[:2])
+        self.assertEqual(page_stats['failed'], 2)
+
+    def test_failed_pages_do_not_fall_back_to_old_snapshots(self):
+        self.scrap({url: (200, content, {}) for url, content in PAGES.items()})
+
+        with patch(
+            'kami_pricing.scraper.time.time', return_value=time.time() + 61
+        ):
+            sellers, _, page_stats = self.scrap(
+                {url: (503, b'error', {}) for url in PAGES},
+                max_snapshot_age=60,
+            )
+
+        self.assertEqual(sellers, [])
+        self.assertEqual(page_stats['failed'], 3)
+
+    def test_not_modified_pages_refresh_their_snapshot(self):
+        self.scrap({url: (200, content, {}) for url, content in PAGES.items()})
+        fetched_at = self.page_cache.get_snapshots(PAGES)[
+            'https://www.belezanaweb.com.br/p1'
+        ].fetched_at
+
+        with patch(
+            'kami_pricing.scraper.time.time', return_value=fetched_at + 100
+        ):
+            self.scrap({url: (304, b'', {}) for url in PAGES})
+
+        self.assertEqual(
+            self.page_cache.get_snapshots(PAGES)[
+                'https://www.belezanaweb.com.br/p1'
+            ].fetched_at,
+            fetched_at + 100,
+        )
+
+    def test_error_responses_without_snapshot_have_no_sellers(self):
+        responses = {url: (200, content, {}) for url, content in PAGES.items()}
+        responses['https://www.belezanaweb.com.br/p2'] = (503, b'error', {})
+
+        sellers, _, page_stats = self.scrap(responses)
+
+        self.assertEqual(sellers, EXPECTED_SELLERS[:2] + EXPECTED_SELLERS[3:])
+        self.assertEqual(page_stats['failed'], 1)
+        self.assertEqual(page_stats['parsed'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest.mock import MagicMock
+
+from kami_pricing.sheet_snapshot import SheetSnapshot, SheetSnapshotError
+
+RANGES = ['pricing!A1:A', 'skushairpro!A1:B', 'sku!A1:B']
+BATCH_RESPONSE = {
+    'valueRanges': [
+        {
+            'range': 'pricing!A1:A1000',
+            'values': [['urls'], ['https://www.belezanaweb.com.br/p1']],
+        },
+        {
+            'range': 'skushairpro!A1:B1000',
+            'values': [['SKU Seller', 'SKU Beleza'], ['K001', 'B001']],
+        },
+        {
+            'range': 'sku!A1:B1000',
+            'values': [['sku', 'status'], ['K001', 'ATIVO']],
+        },
+    ]
+}
+
+
+class TestSheetSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.gsheet = MagicMock()
+        self.batch_get = (
+            self.gsheet.service.spreadsheets.return_value.values.return_value.batchGet
+        )
+        self.batch_get.return_value.execute.return_value = BATCH_RESPONSE
+
+    def test_loads_all_ranges_in_one_request(self):
+        snapshot = SheetSnapshot(self.gsheet, 'sheet-id', RANGES).load()
+
+        self.batch_get.assert_called_once_with(
+            spreadsheetId='sheet-id', ranges=RANGES
+        )
+        self.assertEqual(
+            list(snapshot.get_dataframe('pricing!A1:A')['urls']),
+            ['https://www.belezanaweb.com.br/p1'],
+        )
+        self.assertEqual(
+            snapshot.get_dataframe('sku!A1:B').to_dict('records'),
+            [{'sku': 'K001', 'status': 'ATIVO'}],
+        )
+
+    def test_empty_range_becomes_empty_dataframe(self):
+        self.batch_get.return_value.execute.return_value = {
+            'valueRanges': [{'range': 'pricing!A1:A1000'}]
+        }
+        snapshot = SheetSnapshot(self.gsheet, 'sheet-id', RANGES[:1]).load()
+
+        self.assertTrue(snapshot.get_dataframe('pricing!A1:A').empty)
+
+    def test_unknown_range_raises(self):
+        snapshot = SheetSnapshot(self.gsheet, 'sheet-id', RANGES).load()
+
+        with self.assertRaises(SheetSnapshotError):
+            snapshot.get_dataframe('ebit!A1:E')
+
+    def test_request_failure_raises(self):
+        self.batch_get.return_value.execute.side_effect = Exception('quota')
+
+        with self.assertRaises(SheetSnapshotError):
+            SheetSnapshot(self.gsheet, 'sheet-id', RANGES).load()
+
+
+if __name__ == '__main__':
+    unittest.main()